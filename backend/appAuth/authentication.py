@@ -0,0 +1,86 @@
+import functools
+
+from django.http import JsonResponse
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .user_cache import aget_cached_user, get_cached_user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the token's user through the user cache,
+    so an authenticated request costs no queries for the user or its staff
+    record while the cache entry lives. Entries are dropped whenever the user
+    or its staff record is saved, which also covers password changes.
+    """
+    def get_user(self, validated_token):
+        return self.check_user(get_cached_user(self.get_user_id(validated_token)), validated_token)
+
+    async def aauthenticate(self, request):
+        """
+        `authenticate` for async views: the token is checked the same way and
+        the user is loaded with the async cache and ORM APIs.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user = await aget_cached_user(self.get_user_id(validated_token))
+        return self.check_user(user, validated_token), validated_token
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    def check_user(self, user, validated_token):
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+async def authenticate_async_request(request):
+    """
+    Authenticate an async view's request with a JWT, setting `request.user`.
+    Returns the 401 response to send back when that fails, like DRF's
+    IsAuthenticated would, and None otherwise.
+    """
+    authenticator = CachedJWTAuthentication()
+    try:
+        result = await authenticator.aauthenticate(request)
+    except (AuthenticationFailed, InvalidToken) as e:
+        data = e.detail if isinstance(e.detail, (list, dict)) else {'detail': e.detail}
+        response = JsonResponse(data, status=e.status_code, safe=False)
+    else:
+        if result is not None:
+            request.user, request.auth = result
+            return None
+        response = JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    response['WWW-Authenticate'] = authenticator.authenticate_header(request)
+    return response
+
+
+def async_jwt_required(view):
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        error = await authenticate_async_request(request)
+        if error is not None:
+            return error
+        return await view(request, *args, **kwargs)
+    return wrapper
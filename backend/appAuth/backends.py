@@ -1,6 +1,38 @@
+from django.conf import settings
 from django.contrib.auth.backends import BaseBackend
-from management.models import Staff
+from django.contrib.auth.hashers import check_password
 from .models import User
+from .user_cache import get_cached_user
+
+
+def get_login_user(staff_id, department, email):
+    """
+    Find the user account of the staff member matching all three login
+    credentials, with the staff record joined in the same query.
+    """
+    return User.objects.select_related('staff').filter(
+        staff__staff_id=staff_id,
+        staff__department=department,
+        staff__email=email
+    ).first()
+
+
+def verify_password(user, password):
+    """
+    Check `password` for `user`, or, when there is no user, spend the same
+    hashing time on a throwaway password so failed lookups and wrong
+    passwords take equally long.
+    """
+    if user is None:
+        User().set_password(password)
+        return False
+
+    def rehash(raw_password):
+        user.set_password(raw_password)
+        user.save(update_fields=['password'])
+
+    setter = rehash if getattr(settings, 'PASSWORD_REHASH_ON_LOGIN', True) else None
+    return check_password(password, user.password, setter)
 
 
 class StaffAuthBackend(BaseBackend):
@@ -8,27 +40,10 @@ class StaffAuthBackend(BaseBackend):
     Authenticate using staff_id, department, email combination
     """
     def authenticate(self, request, staff_id=None, department=None, email=None, password=None):
-        try:
-            # Find staff with all three credentials
-            staff = Staff.objects.get(
-                staff_id=staff_id,
-                department=department,
-                email=email
-            )
-            
-            # Get associated user
-            user = User.objects.get(staff=staff)
-            
-            # Check password
-            if user.check_password(password):
-                return user
-        except (Staff.DoesNotExist, User.DoesNotExist):
-            return None
-        
+        user = get_login_user(staff_id, department, email)
+        if verify_password(user, password):
+            return user
         return None
 
     def get_user(self, user_id):
-        try:
-            return User.objects.get(pk=user_id)
-        except User.DoesNotExist:
-            return None
\ No newline at end of file
+        return get_cached_user(user_id)
\ No newline at end of file
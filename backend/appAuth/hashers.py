@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the work factor taken from PASSWORD_HASHER_ITERATIONS.
+
+    It keeps the `pbkdf2_sha256` algorithm name, so existing hashes keep
+    verifying; hashes stored with a different iteration count are upgraded on
+    the next successful login when PASSWORD_REHASH_ON_LOGIN is enabled.
+    """
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASHER_ITERATIONS', PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from appAuth.models import User
+from appAuth.serializers import LoginSerializer
+from management.models import Staff
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure login throughput through LoginSerializer: successful logins, wrong "
+        "passwords and unknown staff, with the queries each one runs. Test accounts are "
+        "created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--logins', type=int, default=100, help='Logins timed per scenario')
+        parser.add_argument('--iterations', type=int, help='Override PASSWORD_HASHER_ITERATIONS')
+
+    def handle(self, *args, **options):
+        overrides = {}
+        if options['iterations']:
+            overrides['PASSWORD_HASHER_ITERATIONS'] = options['iterations']
+        with override_settings(**overrides):
+            try:
+                with transaction.atomic():
+                    self.run(options)
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def run(self, options):
+        credentials = []
+        for i in range(options['users']):
+            staff = Staff.objects.create(
+                staff_id=f'LOGINBENCH{i:05d}', name=f'Login Bench {i}', department='ICT',
+                role='staff', email=f'loginbench{i}@example.com'
+            )
+            User.objects.create_user(email=staff.email, password='bench-password', staff=staff)
+            credentials.append({'staff_id': staff.staff_id, 'department': 'ICT', 'email': staff.email})
+
+        scenarios = {
+            'valid': lambda c: {**c, 'password': 'bench-password'},
+            'wrong password': lambda c: {**c, 'password': 'not-the-password'},
+            'unknown staff': lambda c: {**c, 'staff_id': 'NOPE', 'password': 'bench-password'},
+        }
+        for label, make_payload in scenarios.items():
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for i in range(options['logins']):
+                    LoginSerializer(data=make_payload(credentials[i % len(credentials)])).is_valid()
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label:<16} {options['logins'] / elapsed:8.1f} logins/s  "
+                f"{elapsed / options['logins'] * 1000:8.2f} ms/login  "
+                f"{len(queries) / options['logins']:.1f} queries/login"
+            )
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .backends import get_login_user, verify_password
 from .models import User
 from management.models import Staff
 
@@ -39,28 +40,14 @@ class LoginSerializer(serializers.Serializer):
         if not all([staff_id, department, email, password]):
             raise serializers.ValidationError('All fields are required')
 
-        # Find staff with matching credentials
-        try:
-            staff = Staff.objects.get(
-                staff_id=staff_id,
-                department=department,
-                email=email
-            )
-        except Staff.DoesNotExist:
-            raise serializers.ValidationError('Invalid credentials')
-
-        # Check if user account exists for this staff
-        try:
-            user = staff.user
-        except User.DoesNotExist:
-            raise serializers.ValidationError('No user account found for this staff member')
-
-        # Check password
-        if not user.check_password(password):
+        # One joined query for staff and user; the password is hashed even
+        # when nothing matches so failures all take the same time
+        user = get_login_user(staff_id, department, email)
+        if not verify_password(user, password):
             raise serializers.ValidationError('Invalid credentials')
 
         # Check if staff is active
-        if staff.status != 'active':
+        if user.staff.status != 'active':
             raise serializers.ValidationError('Staff account is inactive')
 
         if not user.is_active:
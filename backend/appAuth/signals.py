@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from management.cache import invalidate
+from management.models import Staff
+from .models import User
+from .user_cache import invalidate_staff_user, invalidate_user
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_profiles(sender, instance, **kwargs):
+    invalidate(User)
+    invalidate_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Staff)
+def invalidate_cached_staff_user(sender, instance, **kwargs):
+    invalidate_staff_user(instance.pk)
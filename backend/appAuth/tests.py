@@ -1,3 +1,132 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from management.models import Staff
+from .models import User
+from .serializers import LoginSerializer
+from .user_cache import get_cached_user, user_cache_key
+
+
+def make_user(password='secret123', **kwargs):
+    staff = Staff.objects.create(
+        staff_id=kwargs.pop('staff_id', 'NM00001'), name='Amina Bello', department='ICT',
+        role='staff', email='amina@nmdpra.gov.ng', **kwargs
+    )
+    return User.objects.create_user(email=staff.email, password=password, staff=staff)
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False}, AUTH_USER_CACHE_ENABLED=True)
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_user_and_staff_are_loaded_once(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.data['department'], 'ICT')
+        with self.assertNumQueries(0):
+            self.client.get('/api/auth/profile/')
+
+    def test_staff_changes_invalidate_the_cached_user(self):
+        self.client.get('/api/auth/profile/')
+        staff = self.user.staff
+        staff.department = 'Finance'
+        staff.save()
+        self.assertEqual(self.client.get('/api/auth/profile/').data['department'], 'Finance')
+
+    def test_deactivated_users_are_rejected(self):
+        self.client.get('/api/auth/profile/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+    @mock.patch('management.signals.log_activity')
+    def test_rows_cached_before_the_commit_are_dropped(self, log_activity):
+        stale = get_cached_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+            # A concurrent request that read the row before the commit
+            cache.set(user_cache_key(self.user.pk), stale)
+            staff = self.user.staff
+            staff.department = 'Finance'
+            staff.save()
+            cache.set(user_cache_key(self.user.pk), stale)
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_staff_saves_do_not_look_up_users(self):
+        staff = Staff.objects.create(
+            staff_id='NM00002', name='Musa Aminu', department='ICT', role='staff', email='musa@nmdpra.gov.ng'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            staff.save()
+        self.assertFalse([query for query in queries if '"users"' in query['sql']])
+
+    @override_settings(AUTH_USER_CACHE_ENABLED=False)
+    def test_per_process_cache_is_not_used(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        # A write seen by another worker: no invalidation reaches this process
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+    async def test_async_profile(self):
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        response = await self.async_client.get('/api/auth/async/profile/', headers=headers)
+        self.assertEqual(response.json()['department'], 'ICT')
+        self.user.is_active = False
+        await self.user.asave()
+        response = await self.async_client.get('/api/auth/async/profile/', headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(PASSWORD_HASHER_ITERATIONS=1000)
+class LoginTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.payload = {
+            'staff_id': 'NM00001', 'department': 'ICT', 'email': 'amina@nmdpra.gov.ng', 'password': 'secret123'
+        }
+
+    def validate(self, **changes):
+        serializer = LoginSerializer(data={**self.payload, **changes})
+        return serializer.is_valid(), serializer
+
+    def test_login_resolves_staff_and_user_in_one_query(self):
+        with self.assertNumQueries(1):
+            valid, serializer = self.validate()
+        self.assertTrue(valid)
+        self.assertEqual(serializer.validated_data['user'], self.user)
+
+    def test_failures_share_one_message(self):
+        for changes in ({'password': 'wrong'}, {'department': 'Finance'}, {'staff_id': 'NM99999'}):
+            valid, serializer = self.validate(**changes)
+            self.assertFalse(valid)
+            self.assertEqual(serializer.errors['non_field_errors'], ['Invalid credentials'])
+
+    def test_unknown_staff_still_hashes_the_password(self):
+        with mock.patch('appAuth.backends.User.set_password') as set_password:
+            self.validate(staff_id='NM99999')
+        set_password.assert_called_once_with('secret123')
+
+    def test_password_is_rehashed_when_the_cost_changes(self):
+        with override_settings(PASSWORD_HASHER_ITERATIONS=2000):
+            self.assertTrue(self.validate()[0])
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+
+    @override_settings(PASSWORD_REHASH_ON_LOGIN=False)
+    def test_rehash_can_be_disabled(self):
+        with override_settings(PASSWORD_HASHER_ITERATIONS=2000):
+            self.assertTrue(self.validate()[0])
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
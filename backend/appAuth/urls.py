@@ -5,5 +5,6 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('register/', views.register_staff_view, name='register'),
     path('profile/', views.user_profile_view, name='profile'),
+    path('async/profile/', views.user_profile_async_view, name='profile-async'),
     path('logout/', views.logout_view, name='logout'),
 ]
\ No newline at end of file
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import User
+
+
+def user_cache_enabled():
+    return getattr(settings, 'AUTH_USER_CACHE_ENABLED', True)
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def staff_user_key(staff_id):
+    # The id of the cached user linked to a staff record, so staff changes
+    # find the user to drop without a query
+    return f'auth:staff-user:{staff_id}'
+
+
+def cache_entries(user):
+    entries = {user_cache_key(user.pk): user}
+    if user.staff_id is not None:
+        entries[staff_user_key(user.staff_id)] = user.pk
+    return entries
+
+
+def get_cached_user(user_id):
+    """
+    Return the user with its staff record already joined, from the cache when
+    it is enabled. Returns None when no such user exists.
+    """
+    if not user_cache_enabled():
+        return User.objects.select_related('staff').filter(pk=user_id).first()
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.select_related('staff').filter(pk=user_id).first()
+        if user is not None:
+            cache.set_many(cache_entries(user), getattr(settings, 'AUTH_USER_CACHE_TTL', 300))
+    return user
+
+
+async def aget_cached_user(user_id):
+    """
+    Async version of `get_cached_user` for async views.
+    """
+    if not user_cache_enabled():
+        return await User.objects.select_related('staff').filter(pk=user_id).afirst()
+    key = user_cache_key(user_id)
+    user = await cache.aget(key)
+    if user is None:
+        user = await User.objects.select_related('staff').filter(pk=user_id).afirst()
+        if user is not None:
+            await cache.aset_many(cache_entries(user), getattr(settings, 'AUTH_USER_CACHE_TTL', 300))
+    return user
+
+
+def invalidate_user(user_id):
+    """
+    Drop the cached user now and again on commit, so a request that read the
+    old row before the commit cannot cache it for the whole TTL.
+    """
+    if not user_cache_enabled():
+        return
+    key = user_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def invalidate_staff_user(staff_id):
+    """
+    Drop the cached user linked to a staff record, if one is cached. Like
+    `invalidate_user`, now and again on commit.
+    """
+    if not user_cache_enabled():
+        return
+
+    def drop():
+        user_id = cache.get(staff_user_key(staff_id))
+        if user_id is not None:
+            cache.delete_many([user_cache_key(user_id), staff_user_key(staff_id)])
+    drop()
+    transaction.on_commit(drop)
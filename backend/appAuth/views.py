@@ -1,8 +1,12 @@
+from django.http import JsonResponse
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
+from management.cache import cache_user_response
+from management.models import Staff
+from .authentication import async_jwt_required
 from .serializers import LoginSerializer, RegisterStaffSerializer, UserSerializer
 from .models import User
 
@@ -56,11 +60,18 @@ def register_staff_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cache_user_response('profile', [User, Staff])
 def user_profile_view(request):
     serializer = UserSerializer(request.user)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@async_jwt_required
+async def user_profile_async_view(request):
+    # The cached user comes with its staff row, so serializing runs no query
+    return JsonResponse(UserSerializer(request.user).data)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -88,12 +89,103 @@ WSGI_APPLICATION = 'docstream.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+# DATABASE_ENGINE=postgresql selects PostgreSQL (requires
+# `pip install "psycopg[binary,pool]"`), configured by the DATABASE_*
+# variables. Hosts in DATABASE_REPLICA_HOSTS become `replica_N` aliases
+# that serve management list/retrieve reads, see management.routers.
+# Otherwise SQLite is used in WAL mode, so readers do not block the writer.
+
+DATABASE_ENGINE = os.environ.get('DATABASE_ENGINE', 'sqlite3')
+
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', 60))
+
+if DATABASE_ENGINE == 'postgresql':
+    DATABASE_POOL = os.environ.get('DATABASE_POOL', 'false').lower() == 'true'
+
+    def postgresql_database(host):
+        return {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'docstream'),
+            'USER': os.environ.get('DATABASE_USER', 'docstream'),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': host,
+            'PORT': os.environ.get('DATABASE_PORT', '5432'),
+            # A pooled connection is returned to the pool after each request
+            # instead of being kept open by the worker
+            'CONN_MAX_AGE': 0 if DATABASE_POOL else DATABASE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+                },
+            } if DATABASE_POOL else {},
+        }
+
+    DATABASES = {
+        'default': postgresql_database(os.environ.get('DATABASE_HOST', 'localhost')),
+    }
+    replica_hosts = [host.strip() for host in os.environ.get('DATABASE_REPLICA_HOSTS', '').split(',') if host.strip()]
+    for index, host in enumerate(replica_hosts):
+        DATABASES[f'replica_{index}'] = {**postgresql_database(host), 'TEST': {'MIRROR': 'default'}}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+                # Take the write lock when a transaction starts instead of
+                # failing with "database is locked" when it first writes
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+        }
+    }
+
+DATABASE_ROUTERS = ['management.routers.ReplicaRouter']
+
+# Seconds after a write during which the written model is read from the
+# primary rather than the replicas; keep it above the replicas' usual lag
+REPLICA_READS = {
+    'MAX_LAG': int(os.environ.get('DATABASE_REPLICA_MAX_LAG', 5)),
+}
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Set REDIS_URL (e.g. redis://localhost:6379/0) to share the cache between
+# workers; this needs the `redis` package. Without it a per-process local
+# memory cache is used.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'docstream',
+        }
     }
+
+# Response cache for the management list/retrieve endpoints and the profile
+# view, see management.cache. Writes invalidate it through the cache itself,
+# so a per-process memory cache is only correct with a single worker: the
+# response cache is off unless REDIS_URL is set, and RESPONSE_CACHE_ENABLED
+# can turn it on for single-process deployments.
+RESPONSE_CACHE = {
+    'ENABLED': os.environ.get(
+        'RESPONSE_CACHE_ENABLED', 'true' if os.environ.get('REDIS_URL') else 'false'
+    ).lower() == 'true',
+    'CACHE_ALIAS': 'default',
+    'TTL': 60,
 }
 
 
@@ -116,6 +208,25 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.1/topics/auth/passwords/
+# The PBKDF2 work factor is tunable per deployment; stored hashes with a
+# different factor are rehashed on the next login while
+# PASSWORD_REHASH_ON_LOGIN is enabled.
+
+PASSWORD_HASHERS = [
+    'appAuth.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+PASSWORD_HASHER_ITERATIONS = int(os.environ.get('PASSWORD_HASHER_ITERATIONS', 1_000_000))
+
+PASSWORD_REHASH_ON_LOGIN = os.environ.get('PASSWORD_REHASH_ON_LOGIN', 'true').lower() == 'true'
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -128,18 +239,107 @@ USE_I18N = True
 USE_TZ = True
 
 # Django Rest Framework Config
+# API_PROFILE=production serves JSON only, without the browsable API
+API_PROFILE = os.environ.get('API_PROFILE', 'development')
+
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'management.renderers.FastJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    'DEFAULT_PARSER_CLASSES': [
+        'management.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'appAuth.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_FILTER_BACKENDS': [
+        'management.filters.QueryParamFilterBackend',
+        'rest_framework.filters.SearchFilter',
+        'management.filters.StableOrderingFilter',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'management.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 50,
+}
+
+if API_PROFILE == 'production':
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = ['management.renderers.FastJSONRenderer']
+
+# Upper bound for the `?page_size=` query parameter on paginated endpoints
+MAX_PAGE_SIZE = 500
+
+# Largest list accepted by the `<resource>/bulk/` endpoints
+BULK_MAX_ITEMS = 500
+
+# Rows fetched per database round-trip by the streaming exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Staff/facility file imports: rows per transaction and processes the
+# import_records command uses to hash the passwords of imported user
+# accounts. Imports through the API hash in the request thread, so they
+# may create user accounts for at most HTTP_USER_ROWS rows.
+BULK_IMPORT = {
+    'CHUNK_SIZE': 1000,
+    'HASH_WORKERS': os.cpu_count() or 1,
+    'HTTP_USER_ROWS': 50,
+}
+
+# Audit entries are buffered and written in batches off the request thread,
+# see management.activity.ActivityLogWriter
+ACTIVITY_LOG_WRITER = {
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'BACKGROUND': True,
+}
+
+# Activity log rows older than DAYS are moved to the archive table (or to
+# monthly .jsonl.gz files under EXPORT_DIR) by `manage.py archive_activity_logs`
+ACTIVITY_LOG_RETENTION = {
+    'DAYS': 90,
+    'CHUNK_SIZE': 5000,
+    'EXPORT_DIR': None,
+    'PAUSE': 0.0,
+}
+
+# Checklists further than ANOMALY_THRESHOLD standard deviations from their
+# outlet's mean are flagged by /inventory-checklist/analytics/
+INVENTORY_ANALYTICS = {
+    'ANOMALY_THRESHOLD': 3.0,
+}
+
+# Staff/facility typeahead: default and largest `?limit=`, and seconds between
+# full rebuilds of each process's index (which picks up other workers' writes)
+TYPEAHEAD = {
+    'LIMIT': 10,
+    'MAX_LIMIT': 50,
+    'REFRESH_INTERVAL': 300,
+}
+
+# /api/v1/feed/ change events: how many recent events each process keeps for
+# reconnecting clients, how many a client may fall behind before it is
+# disconnected, and seconds between keepalive comments on an idle stream
+CHANGE_FEED = {
+    'BUFFER_SIZE': 1000,
+    'CLIENT_QUEUE_SIZE': 100,
+    'HEARTBEAT': 15,
+}
+
+# Staff roles that act on each pending stage of a vehicle request; stages in
+# DEPARTMENT_SCOPED only show requests from the approver's own department.
+# Admin users can act on every stage.
+VEHICLE_APPROVAL = {
+    'ROLES': {
+        'pending_division_head': ['supervisor'],
+        'pending_corporate_service': ['corporate'],
+        'pending_logistics_officer': ['vehicle_officer'],
+    },
+    'DEPARTMENT_SCOPED': ['pending_division_head'],
 }
 
 # JWT Settings
@@ -155,6 +355,16 @@ AUTHENTICATION_BACKENDS = [
 ]
 
 
+# Authenticated users (with their staff record) are cached for
+# AUTH_USER_CACHE_TTL seconds. Saves drop the entry through the cache itself,
+# so like RESPONSE_CACHE this is off unless the cache is shared (REDIS_URL):
+# with a per-process cache the other workers would keep accepting a
+# deactivated user until the entry expires.
+AUTH_USER_CACHE_ENABLED = os.environ.get(
+    'AUTH_USER_CACHE_ENABLED', 'true' if os.environ.get('REDIS_URL') else 'false'
+).lower() == 'true'
+AUTH_USER_CACHE_TTL = 300
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=5),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
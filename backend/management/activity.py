@@ -0,0 +1,122 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .cache import bump_version
+from .feed import events_for, publish_on_commit
+from .models import ActivityLog, Staff
+from .search import index_objects
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityLogWriter:
+    """
+    Buffers activity log entries in memory and writes them with `bulk_create`.
+
+    A batch is flushed when it reaches `batch_size` entries or when
+    `flush_interval` seconds have passed, whichever comes first. With
+    `background=True` flushing happens on a daemon thread so request threads
+    never wait on the INSERT; otherwise full batches are flushed inline by
+    the caller. `stop()` drains whatever is still buffered.
+    """
+
+    def __init__(self, batch_size=200, flush_interval=2.0, background=True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.background = background
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def log(self, staff_id, activity):
+        with self._lock:
+            self._buffer.append(ActivityLog(created_by_id=staff_id, activity=activity))
+            full = len(self._buffer) >= self.batch_size
+
+        if self.background:
+            self._ensure_started()
+            if full:
+                self._wakeup.set()
+        elif full:
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                entries, self._buffer = self._buffer, []
+            if not entries:
+                return 0
+
+            # Rows owned by staff deleted since the entry was queued would
+            # violate the foreign key, drop them instead of failing the batch.
+            staff_ids = {entry.created_by_id for entry in entries}
+            departments = dict(Staff.objects.filter(pk__in=staff_ids).values_list('pk', 'department'))
+            entries = [entry for entry in entries if entry.created_by_id in departments]
+            with transaction.atomic():
+                entries = ActivityLog.objects.bulk_create(entries, batch_size=self.batch_size)
+                index_objects(ActivityLog, entries)
+                publish_on_commit(events_for(ActivityLog, 'created', entries, departments))
+            bump_version(ActivityLog)
+            return len(entries)
+
+    def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(self.flush_interval, 1) * 5)
+            self._thread = None
+        self.flush()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name='activity-log-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to write activity log batch')
+            finally:
+                connections.close_all()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                config = getattr(settings, 'ACTIVITY_LOG_WRITER', {})
+                _writer = ActivityLogWriter(
+                    batch_size=config.get('BATCH_SIZE', 200),
+                    flush_interval=config.get('FLUSH_INTERVAL', 2.0),
+                    background=config.get('BACKGROUND', True),
+                )
+    return _writer
+
+
+def log_activity(staff_id, activity):
+    """
+    Queue an activity log entry. The entry is only queued once the current
+    transaction commits, so rolled back changes are never audited.
+    """
+    transaction.on_commit(lambda: get_writer().log(staff_id, activity))
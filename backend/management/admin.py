@@ -23,6 +23,15 @@ class InventoryChecklistAdmin(admin.ModelAdmin):
 class ActivityLogAdmin(admin.ModelAdmin):
     list_display = ('id', 'activity', 'created_by', 'created_at')
 
+@admin.register(ActivityLogArchive)
+class ActivityLogArchiveAdmin(admin.ModelAdmin):
+    list_display = ('id', 'activity', 'created_by', 'created_at', 'archived_at')
+
 @admin.register(Facility)
 class FacilityAdmin(admin.ModelAdmin):
-    list_display = ('name', 'address', 'serial_no', 'take_over')
\ No newline at end of file
+    list_display = ('name', 'address', 'serial_no', 'take_over')
+
+@admin.register(StatCounter)
+class StatCounterAdmin(admin.ModelAdmin):
+    list_display = ('metric', 'key', 'value')
+    list_filter = ('metric',)
\ No newline at end of file
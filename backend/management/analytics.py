@@ -0,0 +1,206 @@
+import math
+
+from django.conf import settings
+from django.db.models import DateField
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+METRICS = ('pms_opening', 'product_recieved', 'price_range', 'pump_dispensing_level')
+
+PERIODS = {
+    'day': TruncDate,
+    'week': lambda field: TruncWeek(field, output_field=DateField()),
+    'month': lambda field: TruncMonth(field, output_field=DateField()),
+}
+
+STATS = ('sum', 'mean', 'min', 'max', 'delta_mean')
+
+
+def get_anomaly_threshold():
+    return getattr(settings, 'INVENTORY_ANALYTICS', {}).get('ANOMALY_THRESHOLD', 3.0)
+
+
+def load_columns(queryset, period):
+    """
+    Fetch the checklists of `queryset` as columns (ids, outlets, periods and
+    one column per metric), ordered by outlet then creation time so each
+    outlet, and each period within it, is a contiguous run.
+    """
+    rows = (
+        queryset.annotate(period=PERIODS[period]('created_at'))
+        .order_by('retail_outlet', 'created_at', 'id')
+        .values_list('id', 'retail_outlet', 'period', *METRICS)
+    )
+    columns = list(zip(*rows))
+    if not columns:
+        return [], [], [], [[] for _ in METRICS]
+    ids, outlets, periods, *values = columns
+    return list(ids), list(outlets), list(periods), values
+
+
+def run_starts(*keys):
+    """
+    Start index of each run of equal consecutive `keys` tuples.
+    """
+    if np is not None:
+        n = len(keys[0])
+        changed = np.zeros(n, dtype=bool)
+        changed[:1] = True
+        for key in keys:
+            key = np.asarray(key, dtype=object)
+            changed[1:] |= key[1:] != key[:-1]
+        return np.flatnonzero(changed)
+    rows = list(zip(*keys))
+    return [i for i in range(len(rows)) if i == 0 or rows[i] != rows[i - 1]]
+
+
+def _clean(value):
+    value = float(value)
+    return None if math.isnan(value) else round(value, 4)
+
+
+def _numpy_analysis(outlets, values, outlet_starts, period_starts, threshold):
+    data = np.asarray(values, dtype=float)
+    n = data.shape[1]
+
+    # Change since the outlet's previous checklist; NaN on each outlet's first row
+    deltas = np.full_like(data, np.nan)
+    deltas[:, 1:] = np.diff(data, axis=1)
+    deltas[:, outlet_starts] = np.nan
+    has_delta = ~np.isnan(deltas)
+    delta_counts = has_delta.astype(int)
+    delta_values = np.where(has_delta, deltas, 0.0)
+
+    def reduce(starts):
+        counts = np.diff(np.append(starts, n))
+        sums = np.add.reduceat(data, starts, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta_means = np.add.reduceat(delta_values, starts, axis=1) / np.add.reduceat(delta_counts, starts, axis=1)
+        return counts, {
+            'sum': sums,
+            'mean': sums / counts,
+            'min': np.minimum.reduceat(data, starts, axis=1),
+            'max': np.maximum.reduceat(data, starts, axis=1),
+            'delta_mean': delta_means,
+        }
+
+    outlet_counts, outlet_stats = reduce(outlet_starts)
+    period_counts, period_stats = reduce(period_starts)
+
+    # z-score of every checklist against its own outlet's distribution
+    means = np.repeat(outlet_stats['mean'], outlet_counts, axis=1)
+    squares = np.repeat(np.add.reduceat(data ** 2, outlet_starts, axis=1) / outlet_counts, outlet_counts, axis=1)
+    stds = np.sqrt(np.maximum(squares - means ** 2, 0.0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = np.where(stds > 0, (data - means) / stds, 0.0)
+    flagged = [(int(metric), int(row), float(scores[metric, row])) for metric, row in np.argwhere(np.abs(scores) > threshold)]
+
+    to_lists = lambda stats: {name: [[_clean(v) for v in metric] for metric in column.tolist()] for name, column in stats.items()}
+    return (
+        (outlet_counts.tolist(), to_lists(outlet_stats)),
+        (period_counts.tolist(), to_lists(period_stats)),
+        flagged,
+    )
+
+
+def _python_analysis(outlets, values, outlet_starts, period_starts, threshold):
+    n = len(outlets)
+    outlet_firsts = set(outlet_starts)
+    deltas = [
+        [None if i in outlet_firsts else column[i] - column[i - 1] for i in range(n)]
+        for column in values
+    ]
+
+    def reduce(starts):
+        bounds = list(zip(starts, list(starts[1:]) + [n]))
+        stats = {name: [] for name in STATS}
+        for column, column_deltas in zip(values, deltas):
+            sums = [float(sum(column[a:b])) for a, b in bounds]
+            stats['sum'].append(sums)
+            stats['mean'].append([total / (b - a) for total, (a, b) in zip(sums, bounds)])
+            stats['min'].append([float(min(column[a:b])) for a, b in bounds])
+            stats['max'].append([float(max(column[a:b])) for a, b in bounds])
+            delta_means = []
+            for a, b in bounds:
+                changes = [delta for delta in column_deltas[a:b] if delta is not None]
+                delta_means.append(sum(changes) / len(changes) if changes else math.nan)
+            stats['delta_mean'].append(delta_means)
+        counts = [b - a for a, b in bounds]
+        return counts, {name: [[_clean(v) for v in metric] for metric in column] for name, column in stats.items()}
+
+    outlet_result = reduce(outlet_starts)
+    period_result = reduce(period_starts)
+
+    flagged = []
+    bounds = list(zip(outlet_starts, list(outlet_starts[1:]) + [n]))
+    for metric, column in enumerate(values):
+        for a, b in bounds:
+            mean = sum(column[a:b]) / (b - a)
+            std = math.sqrt(max(sum(v * v for v in column[a:b]) / (b - a) - mean * mean, 0.0))
+            if std > 0:
+                flagged += [(metric, row, (column[row] - mean) / std) for row in range(a, b) if abs(column[row] - mean) / std > threshold]
+    return outlet_result, period_result, flagged
+
+
+def _metrics(stats, group):
+    return {metric: {name: stats[name][index][group] for name in STATS} for index, metric in enumerate(METRICS)}
+
+
+def inventory_analytics(queryset, period='month', threshold=None):
+    """
+    Per-outlet and per-period aggregates of the checklist fuel metrics:
+    sum, mean, min, max and the mean change since the outlet's previous
+    checklist (`delta_mean`). Checklists whose value lies more than
+    `threshold` standard deviations from their outlet's mean are listed as
+    anomalies. The work runs on whole columns with numpy (a requirement);
+    plain Python is only a safety net for when it cannot be imported.
+    """
+    threshold = get_anomaly_threshold() if threshold is None else threshold
+    ids, outlets, periods, values = load_columns(queryset, period)
+    result = {'period': period, 'outlets': [], 'anomalies': []}
+    if not ids:
+        return result
+
+    outlet_starts = run_starts(outlets)
+    period_starts = run_starts(outlets, periods)
+    analyse = _numpy_analysis if np is not None else _python_analysis
+    (outlet_counts, outlet_stats), (period_counts, period_stats), flagged = analyse(
+        outlets, values, outlet_starts, period_starts, threshold
+    )
+
+    flagged.sort(key=lambda item: (item[1], item[0]))
+    period_starts = [int(start) for start in period_starts]
+    group = 0
+    for index, start in enumerate(int(start) for start in outlet_starts):
+        end = start + outlet_counts[index]
+        outlet = {
+            'retail_outlet': outlets[start],
+            'count': outlet_counts[index],
+            'metrics': _metrics(outlet_stats, index),
+            'periods': [],
+        }
+        while group < len(period_starts) and period_starts[group] < end:
+            outlet['periods'].append({
+                'period': periods[period_starts[group]],
+                'count': period_counts[group],
+                'metrics': _metrics(period_stats, group),
+            })
+            group += 1
+        result['outlets'].append(outlet)
+
+    result['anomalies'] = [
+        {
+            'id': ids[row],
+            'retail_outlet': outlets[row],
+            'period': periods[row],
+            'metric': METRICS[metric],
+            'value': values[metric][row],
+            'z_score': round(score, 2),
+        }
+        for metric, row, score in flagged
+    ]
+    return result
@@ -0,0 +1,94 @@
+import gzip
+import json
+import time
+from datetime import timedelta
+from itertools import groupby
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidate
+from .models import ActivityLog, ActivityLogArchive
+from .search import remove_objects
+
+ARCHIVED_FIELDS = ('id', 'activity', 'created_by_id', 'created_at', 'updated_at')
+
+
+def get_retention_settings():
+    config = getattr(settings, 'ACTIVITY_LOG_RETENTION', {})
+    return {
+        'days': config.get('DAYS', 90),
+        'chunk_size': config.get('CHUNK_SIZE', 5000),
+        'export_dir': config.get('EXPORT_DIR'),
+        'pause': config.get('PAUSE', 0.0),
+    }
+
+
+def archive_activity_logs(days=None, chunk_size=None, export_dir=None, pause=None):
+    """
+    Move activity log rows older than `days` out of `activity_logs`.
+
+    Rows are copied into `activity_logs_archive`, or, when `export_dir` is
+    given, appended to one gzip-compressed JSONL file per month
+    (`activity_logs_YYYY_MM.jsonl.gz`). Each chunk of `chunk_size` rows is
+    copied and deleted in its own short transaction, oldest first, so the
+    hot table is never locked for long; `pause` seconds are slept between
+    chunks to give other writers room. Returns the number of rows moved.
+    """
+    defaults = get_retention_settings()
+    days = defaults['days'] if days is None else days
+    chunk_size = chunk_size or defaults['chunk_size']
+    export_dir = defaults['export_dir'] if export_dir is None else export_dir
+    pause = defaults['pause'] if pause is None else pause
+
+    cutoff = timezone.now() - timedelta(days=days)
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                ActivityLog.objects.filter(created_at__lt=cutoff)
+                .order_by('id')
+                .values(*ARCHIVED_FIELDS)[:chunk_size]
+            )
+            if not rows:
+                break
+            if export_dir:
+                export_rows(rows, Path(export_dir))
+            else:
+                ActivityLogArchive.objects.bulk_create(
+                    [ActivityLogArchive(**row) for row in rows], ignore_conflicts=True
+                )
+            ids = [row['id'] for row in rows]
+            ActivityLog.objects.filter(id__in=ids).delete()
+            remove_objects(ActivityLog, ids)
+        moved += len(rows)
+        if len(rows) < chunk_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    if moved:
+        invalidate(ActivityLog)
+        invalidate(ActivityLogArchive)
+    return moved
+
+
+def export_rows(rows, export_dir):
+    export_dir.mkdir(parents=True, exist_ok=True)
+    month_of = lambda row: row['created_at'].strftime('%Y_%m')
+    for month, month_rows in groupby(sorted(rows, key=month_of), key=month_of):
+        # gzip members can be concatenated, so appending keeps one file per month
+        with gzip.open(export_dir / f'activity_logs_{month}.jsonl.gz', 'at', encoding='utf-8') as archive:
+            for row in month_rows:
+                archive.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+
+
+def run_scheduled_archival():
+    """
+    Entry point for schedulers (cron, celery beat, systemd timers): archives
+    according to the ACTIVITY_LOG_RETENTION setting.
+    """
+    return archive_activity_logs()
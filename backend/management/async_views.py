@@ -0,0 +1,199 @@
+import asyncio
+import base64
+import json
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+from appAuth.authentication import authenticate_async_request
+from .cache import arecently_written, cache_models
+from .feed import FEED_KINDS, format_event, get_feed_settings, get_hub
+from .filters import CommaSeparatedChoiceField, QueryParamFilterBackend, parse_query_params
+from .routers import has_replicas, replica_reads
+from .serializers import get_expand_fields
+from .workflow import is_workflow_admin
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, encoder=DjangoJSONEncoder, safe=False)
+
+
+def error_response(exc):
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(data, status=exc.status_code)
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode()).decode()
+
+
+def decode_cursor(cursor, fields, model):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise ValueError
+        return [model._meta.get_field(field).to_python(value) for field, value in zip(fields, values)]
+    except Exception:
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+
+
+def keyset_after(fields, values):
+    """
+    Rows strictly after `values` in a descending ordering over `fields`,
+    e.g. created_at < c OR (created_at = c AND id < i).
+    """
+    condition = Q()
+    for i, field in enumerate(fields):
+        condition |= Q(**dict(zip(fields[:i], values[:i])), **{f'{field}__lt': values[i]})
+    return condition
+
+
+class AsyncReadView(View):
+    """
+    Async list and retrieve for one management ViewSet, served without
+    occupying a worker thread per request under ASGI. It reuses the
+    ViewSet's queryset, `filter_params`, `?expand=` handling, serializer and
+    keyset ordering. Authentication is JWT only; search, ordering and the
+    response cache stay on the DRF endpoints. Pages carry only a `next`
+    cursor.
+    """
+    viewset = None
+
+    async def get(self, request, pk=None):
+        error = await authenticate_async_request(request)
+        if error is not None:
+            return error
+        drf_request = Request(request)
+        try:
+            queryset = self.get_queryset(drf_request)
+            use_replica = has_replicas() and not await arecently_written(cache_models(queryset.model))
+            with replica_reads(use_replica):
+                if pk is not None:
+                    return await self.retrieve(drf_request, queryset, pk)
+                return await self.list(drf_request, queryset)
+        except ValidationError as exc:
+            return error_response(exc)
+
+    def get_queryset(self, request):
+        queryset = self.viewset.queryset.all()
+        if 'created_by' in get_expand_fields(request) and hasattr(queryset.model, 'created_by'):
+            queryset = queryset.select_related('created_by')
+        return queryset
+
+    def serialize(self, request, instance, many=False):
+        return self.viewset.serializer_class(instance, many=many, context={'request': request}).data
+
+    async def retrieve(self, request, queryset, pk):
+        instance = await queryset.filter(pk=pk).afirst()
+        if instance is None:
+            return json_response({'detail': 'No %s matches the given query.' % queryset.model._meta.object_name}, 404)
+        return json_response(self.serialize(request, instance))
+
+    async def list(self, request, queryset):
+        ordering = [field.lstrip('-') for field in self.viewset.pagination_class.ordering]
+        page_size = self.get_page_size(request)
+        queryset = QueryParamFilterBackend().filter_queryset(request, queryset, self.viewset)
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            queryset = queryset.filter(keyset_after(ordering, decode_cursor(cursor, ordering, queryset.model)))
+        queryset = queryset.order_by(*self.viewset.pagination_class.ordering)
+
+        rows = [obj async for obj in queryset[:page_size + 1]]
+        next_url = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            query = request._request.GET.copy()
+            query['cursor'] = encode_cursor([getattr(rows[-1], field) for field in ordering])
+            next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+        return json_response({'next': next_url, 'results': self.serialize(request, rows, many=True)})
+
+    def get_page_size(self, request):
+        default = settings.REST_FRAMEWORK.get('PAGE_SIZE', 50)
+        try:
+            page_size = int(request.query_params.get('page_size', default))
+        except ValueError:
+            raise ValidationError({'page_size': 'A valid integer is required.'})
+        return max(1, min(page_size, getattr(settings, 'MAX_PAGE_SIZE', 500)))
+
+
+def feed_filter(user, kinds=None, department=None):
+    """
+    Which change events `user` receives: admins see every department,
+    everyone else their own department's events and those of records
+    without one (facilities).
+    """
+    own = None if user.is_staff or is_workflow_admin(user) else getattr(getattr(user, 'staff', None), 'department', '')
+
+    def visible(event):
+        if kinds and event['type'] not in kinds:
+            return False
+        if department is not None and event['department'] != department:
+            return False
+        return own is None or event['department'] in (own, None)
+    return visible
+
+
+async def change_feed_view(request):
+    """
+    Server-Sent Events stream of create/update/delete events for the
+    management models, optionally narrowed with `?type=` and `?department=`.
+    Reconnecting clients send `Last-Event-ID` (or `?last_event_id=`) to
+    resume; a `reset` event means the missed events are gone and lists
+    should be reloaded, `overflow` that the client fell too far behind and
+    was disconnected.
+
+    The stream only works under an ASGI server: a WSGI server (including
+    `runserver`) drains the response before sending it, so the request
+    would hang without delivering an event. Those get a 503 instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return json_response({'detail': (
+            'The change feed needs an ASGI server, e.g. `uvicorn docstream.asgi:application`.'
+        )}, status=503)
+    error = await authenticate_async_request(request)
+    if error is not None:
+        return error
+    try:
+        options = parse_query_params(Request(request), {
+            'type': CommaSeparatedChoiceField(sorted(FEED_KINDS.values()), required=False),
+            'department': serializers.CharField(required=False),
+        })
+    except ValidationError as exc:
+        return error_response(exc)
+
+    hub, heartbeat = get_hub(), get_feed_settings()['heartbeat']
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    subscriber, replay = hub.subscribe(
+        feed_filter(request.user, options.get('type'), options.get('department')), last_event_id
+    )
+
+    async def stream():
+        try:
+            if replay is None:
+                yield 'event: reset\ndata: {}\n\n'
+            for event in replay or ():
+                yield format_event(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                if event is None:
+                    yield 'event: overflow\ndata: {}\n\n'
+                    return
+                yield format_event(event)
+        finally:
+            hub.unsubscribe(subscriber)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
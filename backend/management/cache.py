@@ -0,0 +1,180 @@
+import functools
+import hashlib
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+from .routers import get_replica_settings, has_replicas
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache_settings():
+    config = getattr(settings, 'RESPONSE_CACHE', {})
+    return {
+        'enabled': config.get('ENABLED', True),
+        'alias': config.get('CACHE_ALIAS', 'default'),
+        'ttl': config.get('TTL', 60),
+    }
+
+
+def get_cache():
+    return caches[get_cache_settings()['alias']]
+
+
+def record(namespace, outcome):
+    with _stats_lock:
+        _stats[f'{namespace}.{outcome}'] += 1
+        _stats[outcome] += 1
+
+
+def cache_stats():
+    """
+    Hit/miss counters of this process, overall and per namespace.
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def version_key(model):
+    return f'resp:version:{model._meta.label_lower}'
+
+
+def get_versions(models):
+    keys = [version_key(model) for model in models]
+    versions = get_cache().get_many(keys)
+    return '.'.join(str(versions.get(key, 0)) for key in keys)
+
+
+def written_key(model):
+    return f'resp:written:{model._meta.label_lower}'
+
+
+def bump_version(model):
+    """
+    Move `model` to a new version, and with read replicas configured, mark
+    it as written for the replicas' maximum lag, see `recently_written`.
+    """
+    cache = get_cache()
+    key = version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+    if has_replicas():
+        cache.set(written_key(model), True, get_replica_settings()['max_lag'])
+
+
+def recently_written(models):
+    """
+    Whether one of `models` was written in the last REPLICA_READS MAX_LAG
+    seconds, so a replica may not have the change yet.
+    """
+    return bool(get_cache().get_many([written_key(model) for model in models]))
+
+
+async def arecently_written(models):
+    return bool(await get_cache().aget_many([written_key(model) for model in models]))
+
+
+def cache_models(model):
+    """
+    `model` and the models it has a foreign key to: the models whose
+    changes a response about `model` depends on.
+    """
+    return [model] + [field.related_model for field in model._meta.concrete_fields if field.is_relation]
+
+
+def invalidate(model):
+    """
+    Drop every cached response that depends on `model`. The version is bumped
+    now, so the writing transaction stops reading stale entries, and again on
+    commit, so responses cached by other requests before the commit are
+    discarded too.
+    """
+    bump_version(model)
+    transaction.on_commit(lambda: bump_version(model))
+
+
+def permission_scope(user):
+    return f'{int(user.is_superuser)}{int(user.is_staff)}{int(getattr(user, "is_admin", False))}'
+
+
+def make_key(namespace, models, request, per_user=False):
+    scope = f'u{request.user.pk}' if per_user else permission_scope(request.user)
+    query = hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+    return f'resp:{namespace}:{scope}:{get_versions(models)}:{query}'
+
+
+def cached_get(namespace, models, request, compute, per_user=False):
+    """
+    Return the cached response for this GET request or build it with
+    `compute()` and cache its data and validators when it is a 200.
+    """
+    config = get_cache_settings()
+    if not config['enabled'] or request.method != 'GET':
+        return compute()
+
+    cache = get_cache()
+    key = make_key(namespace, models, request, per_user=per_user)
+    entry = cache.get(key)
+    if entry is not None:
+        record(namespace, 'hits')
+        data, headers = entry
+        etag = headers.get('ETag')
+        response = etag and get_conditional_response(request, etag=etag)
+        if not response:
+            response = Response(data)
+        for header, value in headers.items():
+            response[header] = value
+        response['X-Cache'] = 'HIT'
+        return response
+
+    record(namespace, 'misses')
+    response = compute()
+    if response.status_code == 200 and hasattr(response, 'data'):
+        headers = {header: response[header] for header in ('ETag', 'Last-Modified') if header in response}
+        cache.set(key, (response.data, headers), config['ttl'])
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+class CachedResponseMixin:
+    """
+    Serves `list` and `retrieve` from the response cache. Entries are keyed by
+    the user's permission scope and the full query string, and are dropped
+    whenever the ViewSet's model or a model it has a foreign key to changes.
+    """
+
+    def get_cache_models(self):
+        return cache_models(self.get_queryset().model)
+
+    def get_cache_namespace(self):
+        return self.basename
+
+    def list(self, request, *args, **kwargs):
+        compute = lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs)
+        return cached_get(f'{self.get_cache_namespace()}.list', self.get_cache_models(), request, compute)
+
+    def retrieve(self, request, *args, **kwargs):
+        compute = lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs)
+        return cached_get(f'{self.get_cache_namespace()}.retrieve', self.get_cache_models(), request, compute)
+
+
+def cache_user_response(namespace, models):
+    """
+    Cache a per-user GET function view, dropped when one of `models` changes.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            compute = lambda: view(request, *args, **kwargs)
+            return cached_get(namespace, models, request, compute, per_user=True)
+        return wrapper
+    return decorator
@@ -0,0 +1,84 @@
+import csv
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import *
+
+EXPORTABLE_MODELS = {
+    'staff': Staff,
+    'item-request': ItemRequest,
+    'vehicle-request': VehicleRequest,
+    'inventory-checklist': InventoryChecklist,
+    'activity-log': ActivityLog,
+    'facility': Facility,
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+# Rows are joined into pieces of about this many bytes before being yielded
+BUFFER_SIZE = 64 * 1024
+
+
+class Echo:
+    """
+    File-like object whose `write` returns the value, so `csv.writer` can
+    format rows without buffering them.
+    """
+    def write(self, value):
+        return value
+
+
+def export_columns(model):
+    return [field.name for field in model._meta.concrete_fields]
+
+
+def export_rows(queryset, output='csv', chunk_size=2000):
+    """
+    Yield the rows of `queryset` encoded as CSV or JSONL, in primary key
+    order. Rows are fetched with `iterator(chunk_size)` as plain tuples, so
+    memory stays flat whatever the size of the table.
+    """
+    columns = export_columns(queryset.model)
+    rows = queryset.order_by('pk').values_list(*columns).iterator(chunk_size=chunk_size)
+
+    if output == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(columns).encode()
+        encode = lambda row: writer.writerow(row)
+    elif output == 'jsonl':
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+        encode = lambda row: encoder.encode(dict(zip(columns, row))) + '\n'
+    else:
+        raise ValueError(f'Unsupported export format: {output}')
+
+    pending, size = [], 0
+    for row in rows:
+        line = encode(row)
+        pending.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield ''.join(pending).encode()
+            pending, size = [], 0
+    if pending:
+        yield ''.join(pending).encode()
+
+
+def gzip_stream(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+    for index, chunk in enumerate(chunks):
+        compressed = compressor.compress(chunk)
+        if index == 0:
+            # Push the header and first chunk out instead of waiting for
+            # zlib's internal buffer to fill
+            compressed += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_filename(name, output, compress):
+    return f"{name}.{output}{'.gz' if compress else ''}"
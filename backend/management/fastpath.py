@@ -0,0 +1,132 @@
+import datetime
+import functools
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, fields, relations
+from rest_framework.settings import api_settings
+
+
+def identity_safe(field, model_field):
+    """
+    Whether the DRF field returns the database values of `model_field`
+    unchanged, so the plan can copy them without calling it.
+    """
+    internal_type = model_field.get_internal_type()
+    if isinstance(field, fields.ChoiceField):
+        return all(isinstance(key, str) for key in field.choices)
+    if type(field).to_representation is fields.CharField.to_representation:
+        return internal_type in ('CharField', 'TextField', 'EmailField', 'SlugField', 'URLField')
+    if type(field).to_representation is fields.IntegerField.to_representation:
+        return internal_type.endswith(('IntegerField', 'AutoField'))
+    if type(field).to_representation is fields.BooleanField.to_representation:
+        return internal_type == 'BooleanField'
+    if type(field).to_representation is fields.JSONField.to_representation:
+        return not field.binary
+    return False
+
+
+def iso_datetime(field, tz):
+    """
+    DateTimeField.to_representation in ISO 8601 for aware datetimes, with the
+    current timezone looked up once per list rather than once per value.
+    """
+    def convert(value):
+        if tz is None or value.tzinfo is None:
+            return field.to_representation(value)
+        try:
+            value = value.astimezone(tz).isoformat()
+        except OverflowError:
+            return field.to_representation(value)
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def converter(field, model_field):
+    """
+    A factory for the function rendering non-null values of `field`, or None
+    when they are copied as they are. Factories are called once per list, so
+    a converter may depend on the active timezone.
+    """
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        # values() returns the foreign key's id, which is what the field renders
+        return (lambda: field.pk_field.to_representation) if field.pk_field else None
+    if identity_safe(field, model_field):
+        return None
+    field_class = type(field)
+    if field_class.to_representation is fields.DateTimeField.to_representation and not hasattr(field, 'timezone'):
+        if str(getattr(field, 'format', api_settings.DATETIME_FORMAT)).lower() == ISO_8601:
+            return lambda: iso_datetime(field, timezone.get_current_timezone() if settings.USE_TZ else None)
+    if field_class.to_representation is fields.DateField.to_representation:
+        if str(getattr(field, 'format', api_settings.DATE_FORMAT)).lower() == ISO_8601:
+            return lambda: datetime.date.isoformat
+    if field_class.to_representation is fields.FloatField.to_representation:
+        return lambda: float
+    return lambda: field.to_representation
+
+
+class ListPlan:
+    """
+    How to build a serializer's output straight from `values()` rows. Each
+    readable field compiles to the column it reads and, unless the database
+    value already is the output, a converter equivalent to the field's
+    `to_representation`. Fields a row cannot feed (hyperlinks, nested
+    serializers, dotted or method sources) are left out, and a selection
+    including them is served by the serializer instead.
+    """
+
+    def __init__(self, serializer):
+        columns = {field.name: field for field in serializer.Meta.model._meta.concrete_fields}
+        self.steps = {}
+        for name, field in serializer.fields.items():
+            model_field = columns.get(field.source)
+            if field.write_only or model_field is None:
+                continue
+            if not isinstance(field, relations.PrimaryKeyRelatedField) and (
+                isinstance(field, (relations.RelatedField, relations.ManyRelatedField)) or hasattr(field, 'fields')
+            ):
+                continue
+            self.steps[name] = (type(field), model_field.name, converter(field, model_field))
+        self._renderers = {}
+
+    def renderer(self, serializer_fields):
+        """
+        A function turning a list of rows into the output of
+        `serializer_fields`, or None when one of them is not covered by the
+        plan. Its code is generated once per field list, e.g. for `id` and
+        `created_at`:
+
+            def render(rows, c1):
+                return [{'id': row['id'], 'created_at': None if (v := row['created_at']) is None else c1(v)} for row in rows]
+        """
+        names = tuple((name, type(field)) for name, field in serializer_fields.items() if not field.write_only)
+        renderer = self._renderers.get(names, False)
+        if renderer is False:
+            renderer = self.compile(names)
+            # ?fields= combinations are client controlled, keep the cache bounded
+            if len(self._renderers) < 256:
+                self._renderers[names] = renderer
+        return renderer
+
+    def compile(self, names):
+        items, factories = [], {}
+        for i, (name, field_class) in enumerate(names):
+            step = self.steps.get(name)
+            if step is None or step[0] is not field_class:
+                return None
+            _, column, factory = step
+            if factory is None:
+                items.append(f'{name!r}: row[{column!r}]')
+            else:
+                factories[f'c{i}'] = factory
+                # None is passed through without calling the converter, like the serializer does
+                items.append(f'{name!r}: None if (v := row[{column!r}]) is None else c{i}(v)')
+        namespace = {}
+        exec(f"def render(rows, {', '.join(factories)}):\n    return [{{{', '.join(items)}}} for row in rows]", namespace)
+        render, factories = namespace['render'], list(factories.values())
+        return lambda rows: render(rows, *[factory() for factory in factories])
+
+
+@functools.lru_cache(maxsize=None)
+def get_list_plan(serializer_class):
+    return ListPlan(serializer_class())
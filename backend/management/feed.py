@@ -0,0 +1,180 @@
+import asyncio
+import itertools
+import json
+import threading
+import uuid
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import *
+
+# kind of each model published on the change feed
+FEED_KINDS = {
+    Staff: 'staff',
+    ItemRequest: 'item-request',
+    VehicleRequest: 'vehicle-request',
+    InventoryChecklist: 'inventory-checklist',
+    ActivityLog: 'activity-log',
+    Facility: 'facility',
+}
+
+
+def get_feed_settings():
+    config = getattr(settings, 'CHANGE_FEED', {})
+    return {
+        'buffer_size': config.get('BUFFER_SIZE', 1000),
+        'client_queue_size': config.get('CLIENT_QUEUE_SIZE', 100),
+        'heartbeat': config.get('HEARTBEAT', 15),
+    }
+
+
+def department_of(instance, departments):
+    """
+    The department an event about `instance` belongs to: the staff member's
+    own, the creator's for requests and logs, None (everyone) for facilities.
+    A creator that is not loaded is looked up in `departments`, never with a
+    query of its own.
+    """
+    if isinstance(instance, Staff):
+        return instance.department
+    if not hasattr(instance, 'created_by_id'):
+        return None
+    creator = instance._state.fields_cache.get('created_by')
+    return creator.department if creator is not None else departments.get(instance.created_by_id)
+
+
+def events_for(model, action, instances, departments=None):
+    """
+    `(kind, action, pk, department)` events for `instances`. `departments`
+    maps creator ids to departments when the caller already has them;
+    otherwise the creators that are not loaded are resolved at once.
+    """
+    kind = FEED_KINDS[model]
+    if departments is None:
+        departments = {}
+        if hasattr(model, 'created_by_id'):
+            missing = {i.created_by_id for i in instances if 'created_by' not in i._state.fields_cache}
+            if missing:
+                departments = dict(Staff.objects.filter(pk__in=missing).values_list('pk', 'department'))
+    return [(kind, action, i.pk, department_of(i, departments)) for i in instances]
+
+
+def publish_on_commit(events):
+    if events:
+        hub = get_hub()
+        transaction.on_commit(lambda: [hub.publish(*event) for event in events])
+
+
+class Subscriber:
+    """
+    One connected client: a bounded queue on the client's event loop. A
+    client that falls `client_queue_size` events behind is cut off instead
+    of buffering without limit; it reconnects and resumes from its last id.
+    """
+
+    def __init__(self, loop, queue_size, visible):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.visible = visible
+        self.overflowed = False
+
+    def deliver(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop what is queued so the client stops at the last event it
+            # actually received, and resumes from there
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class FeedHub:
+    """
+    In-process fan-out of change events to the clients connected to this
+    process. The last `buffer_size` events are kept so a reconnecting client
+    can resume after the id it last saw. Event ids are `<epoch>-<seq>`; the
+    epoch changes with every process, so an id from another process or from
+    before a restart can never be resumed from.
+    """
+
+    def __init__(self, buffer_size=1000, client_queue_size=100):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.client_queue_size = client_queue_size
+        self._buffer = deque(maxlen=buffer_size)
+        self._sequence = itertools.count(1)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, kind, action, pk, department):
+        """
+        Record one event and hand it to every subscriber that may see it.
+        Safe to call from any thread.
+        """
+        with self._lock:
+            event = {
+                'id': f'{self.epoch}-{next(self._sequence)}',
+                'type': kind, 'action': action, 'object_id': pk, 'department': department,
+            }
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.visible(event):
+                try:
+                    subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+                except RuntimeError:
+                    # The client's event loop is gone
+                    self.unsubscribe(subscriber)
+
+    def subscribe(self, visible, last_event_id=None):
+        """
+        Register a subscriber on the running event loop. Returns it with the
+        buffered events after `last_event_id`, or None in place of that list
+        when those events are no longer buffered and the client must reload.
+        """
+        subscriber = Subscriber(asyncio.get_running_loop(), self.client_queue_size, visible)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            replay = self._replay(last_event_id)
+        if replay is not None:
+            replay = [event for event in replay if visible(event)]
+        return subscriber, replay
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _replay(self, last_event_id):
+        if not last_event_id:
+            return []
+        epoch, _, seq = last_event_id.partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        first = int(self._buffer[0]['id'].rpartition('-')[2]) if self._buffer else seq + 1
+        if seq < first - 1:
+            return None
+        return [event for event in self._buffer if int(event['id'].rpartition('-')[2]) > seq]
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                options = get_feed_settings()
+                _hub = FeedHub(options['buffer_size'], options['client_queue_size'])
+    return _hub
+
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: change\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,179 @@
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Q
+
+from appAuth.models import User
+from .cache import invalidate
+from .models import Facility, Staff
+from .serializers import FacilitySerializer, StaffImportSerializer
+from .signals import post_bulk_create
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def read_rows(file, filename):
+    """
+    Yield the rows of an uploaded CSV or Excel file as dicts keyed by the
+    header row, without reading the whole file into memory.
+    """
+    suffix = Path(filename).suffix.lower()
+    if suffix == '.csv':
+        yield from csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    elif suffix in ('.xlsx', '.xlsm'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFormatError('Excel imports need the openpyxl package; upload a CSV file instead.')
+        rows = load_workbook(file, read_only=True, data_only=True).active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        for values in rows:
+            if any(value is not None for value in values):
+                yield {key: '' if value is None else str(value) for key, value in zip(header, values)}
+    else:
+        raise ImportFormatError('Expected a .csv or .xlsx file.')
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _setup_worker():
+    django.setup()
+
+
+def hash_passwords(passwords, pool=None, workers=1):
+    """
+    Hash `passwords` (None gives an unusable password), spreading the work
+    over `pool` when one is given; PBKDF2 is CPU bound so threads would not help.
+    """
+    if pool is None:
+        return [make_password(password) for password in passwords]
+    return list(pool.map(make_password, passwords, chunksize=max(len(passwords) // (workers * 4), 1)))
+
+
+def hash_pool(workers):
+    if workers <= 1:
+        return nullcontext()
+    return ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker)
+
+
+def get_import_settings():
+    config = getattr(settings, 'BULK_IMPORT', {})
+    return {
+        'chunk_size': config.get('CHUNK_SIZE', 1000),
+        'hash_workers': config.get('HASH_WORKERS', os.cpu_count() or 1),
+        'http_user_rows': config.get('HTTP_USER_ROWS', 50),
+    }
+
+
+def import_staff(rows, create_users=False, chunk_size=None, hash_workers=1):
+    """
+    Load staff rows (and, with `create_users`, a linked user account each)
+    chunk by chunk. Each chunk is validated, checked for duplicate staff ids
+    and emails with one query, then inserted with `bulk_create` in its own
+    transaction. Invalid or duplicate rows are skipped and reported with
+    their 1-based line number (the header is line 1).
+
+    Passwords are hashed inline unless `hash_workers` asks for a process
+    pool, which only the `import_records` command does: forking Django
+    processes from a web worker is not an option.
+    """
+    chunk_size = chunk_size or get_import_settings()['chunk_size']
+
+    created, errors = 0, []
+    seen_staff_ids, seen_emails = set(), set()
+    with hash_pool(hash_workers if create_users else 1) as pool:
+        for chunk_index, chunk in enumerate(chunked(rows, chunk_size)):
+            valid = []
+            for offset, row in enumerate(chunk):
+                line = chunk_index * chunk_size + offset + 2
+                serializer = StaffImportSerializer(data=row)
+                if not serializer.is_valid():
+                    errors.append({'row': line, 'errors': serializer.errors})
+                    continue
+                data = serializer.validated_data
+                if data['staff_id'] in seen_staff_ids or data['email'] in seen_emails:
+                    errors.append({'row': line, 'errors': {'non_field_errors': ['Duplicate staff ID or email in file']}})
+                    continue
+                seen_staff_ids.add(data['staff_id'])
+                seen_emails.add(data['email'])
+                valid.append((line, data))
+
+            if not valid:
+                continue
+
+            staff_ids = [data['staff_id'] for _, data in valid]
+            emails = [data['email'] for _, data in valid]
+            taken = set()
+            for staff_id, email in Staff.objects.filter(Q(staff_id__in=staff_ids) | Q(email__in=emails)).values_list('staff_id', 'email'):
+                taken.update((staff_id, email))
+            if create_users:
+                taken.update(User.objects.filter(email__in=emails).values_list('email', flat=True))
+
+            rows_to_create = []
+            for line, data in valid:
+                if data['staff_id'] in taken or data['email'] in taken:
+                    errors.append({'row': line, 'errors': {'non_field_errors': ['Staff ID or email already exists']}})
+                else:
+                    rows_to_create.append(data)
+            if not rows_to_create:
+                continue
+
+            passwords = [data.pop('password', None) for data in rows_to_create]
+            hashed = hash_passwords(passwords, pool, hash_workers) if create_users else []
+
+            with transaction.atomic():
+                staff = Staff.objects.bulk_create([Staff(**data) for data in rows_to_create])
+                if create_users:
+                    User.objects.bulk_create([
+                        User(email=member.email, staff=member, password=password)
+                        for member, password in zip(staff, hashed)
+                    ])
+                    invalidate(User)
+                post_bulk_create.send(sender=Staff, instances=staff)
+            created += len(staff)
+
+    return {'created': created, 'errors': errors}
+
+
+def import_facilities(rows, chunk_size=None):
+    """
+    Load facility rows chunk by chunk with `bulk_create`, skipping and
+    reporting invalid rows like `import_staff`.
+    """
+    chunk_size = chunk_size or get_import_settings()['chunk_size']
+    created, errors = 0, []
+    for chunk_index, chunk in enumerate(chunked(rows, chunk_size)):
+        facilities = []
+        for offset, row in enumerate(chunk):
+            serializer = FacilitySerializer(data=row)
+            if serializer.is_valid():
+                facilities.append(Facility(**serializer.validated_data))
+            else:
+                errors.append({'row': chunk_index * chunk_size + offset + 2, 'errors': serializer.errors})
+        if facilities:
+            with transaction.atomic():
+                facilities = Facility.objects.bulk_create(facilities)
+                post_bulk_create.send(sender=Facility, instances=facilities)
+            created += len(facilities)
+    return {'created': created, 'errors': errors}
+
+
+IMPORTERS = {
+    'staff': import_staff,
+    'facility': import_facilities,
+}
@@ -0,0 +1,53 @@
+from django.db import transaction
+
+from .models import ItemRequestLine
+
+
+def parse_quantity(value):
+    try:
+        return float(str(value).replace(',', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_items(items):
+    """
+    The line fields of each well-formed entry of an `ItemRequest.items` list;
+    entries without a description are skipped and unreadable quantities are
+    stored as NULL.
+    """
+    if not isinstance(items, list):
+        return []
+    lines = []
+    for position, item in enumerate(items):
+        if not isinstance(item, dict) or not str(item.get('description') or '').strip():
+            continue
+        lines.append({
+            'position': position,
+            'description': str(item['description']).strip()[:255],
+            'unit': str(item.get('unit') or '').strip()[:50],
+            'quantity': parse_quantity(item.get('quantity')),
+        })
+    return lines
+
+
+def build_lines(item_requests):
+    return [
+        ItemRequestLine(item_request_id=item_request.pk, created_at=item_request.created_at, **line)
+        for item_request in item_requests
+        for line in parse_items(item_request.items)
+    ]
+
+
+def create_lines(item_requests):
+    ItemRequestLine.objects.bulk_create(build_lines(item_requests))
+
+
+def sync_lines(item_requests):
+    """
+    Replace the stored lines of `item_requests` with the current contents of
+    their `items`.
+    """
+    with transaction.atomic():
+        ItemRequestLine.objects.filter(item_request__in=[item_request.pk for item_request in item_requests]).delete()
+        create_lines(item_requests)
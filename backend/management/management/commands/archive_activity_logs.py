@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from management.archive import archive_activity_logs
+
+
+class Command(BaseCommand):
+    help = (
+        "Move activity log rows older than the retention window into the archive table "
+        "or into monthly compressed JSONL files. Defaults come from ACTIVITY_LOG_RETENTION."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Keep rows newer than this many days')
+        parser.add_argument('--chunk-size', type=int, help='Rows moved per transaction')
+        parser.add_argument('--export-dir', help='Write monthly .jsonl.gz files here instead of the archive table')
+        parser.add_argument('--pause', type=float, help='Seconds to sleep between chunks')
+        parser.add_argument(
+            '--every', type=int, metavar='SECONDS',
+            help='Keep running and archive again every SECONDS (for hosts without a scheduler)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            moved = archive_activity_logs(
+                days=options['days'],
+                chunk_size=options['chunk_size'],
+                export_dir=options['export_dir'],
+                pause=options['pause'],
+            )
+            self.stdout.write(f'Archived {moved} activity log rows')
+            if not options['every']:
+                break
+            time.sleep(options['every'])
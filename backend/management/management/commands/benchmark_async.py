@@ -0,0 +1,95 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from appAuth.models import User
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and latency of a read endpoint served by the sync DRF view "
+        "through the WSGI handler (one thread per concurrent request), the same view "
+        "through the ASGI handler, and its async mirror under /api/v1/async/. Requests "
+        "run in-process, without a web server, against the configured database, and the "
+        "response cache is disabled so every request reaches the database. Nothing is written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='activity-log/', help='Resource path under /api/v1/, e.g. staff/?page_size=20')
+        parser.add_argument('--email', help='User to authenticate as (default: the first active user)')
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=32)
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        if options['email']:
+            users = users.filter(email=options['email'])
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError('No active user to authenticate as.')
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+        path = options['path'].lstrip('/')
+        scenarios = [
+            ('wsgi sync view', self.run_wsgi, f'/api/v1/{path}'),
+            ('asgi sync view', self.run_asgi, f'/api/v1/{path}'),
+            ('asgi async view', self.run_asgi, f'/api/v1/async/{path}'),
+        ]
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver'], RESPONSE_CACHE={'ENABLED': False}):
+            for label, run, url in scenarios:
+                run(url, 1, 1)  # warm up connections and caches
+                started = time.perf_counter()
+                timings = run(url, options['requests'], options['concurrency'])
+                elapsed = time.perf_counter() - started
+                timings.sort()
+                self.stdout.write(
+                    f"{label:<16} {len(timings) / elapsed:8.1f} req/s  "
+                    f"p50 {percentile(timings, 0.5):8.2f} ms  p99 {percentile(timings, 0.99):8.2f} ms"
+                )
+
+    def check_response(self, response, url):
+        if response.status_code != 200:
+            raise CommandError(f'GET {url} answered {response.status_code}: {response.content[:200]!r}')
+
+    def run_wsgi(self, url, requests, concurrency):
+        def worker(count):
+            client, timings = Client(), []
+            try:
+                for _ in range(count):
+                    started = time.perf_counter()
+                    response = client.get(url, headers=self.headers)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    self.check_response(response, url)
+            finally:
+                connections.close_all()
+            return timings
+
+        counts = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+        with ThreadPoolExecutor(concurrency) as pool:
+            return [t for timings in pool.map(worker, [c for c in counts if c]) for t in timings]
+
+    def run_asgi(self, url, requests, concurrency):
+        async def main():
+            client, timings = AsyncClient(), []
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(url, headers=self.headers)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    self.check_response(response, url)
+
+            await asyncio.gather(*(one() for _ in range(requests)))
+            return timings
+
+        return asyncio.run(main())
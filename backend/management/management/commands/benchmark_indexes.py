@@ -0,0 +1,96 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from management.models import *
+from management.query_plans import hot_queries, uses_index
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed the database with synthetic rows, time the hot listing queries and check "
+        "that their plans use the expected indexes. Everything is rolled back afterwards; "
+        "run it against a scratch database, the seeding holds a write transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Activity log rows to seed')
+        parser.add_argument('--staff', type=int, default=1_000, help='Staff rows to seed')
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=20, help='Timed executions per query')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                failures = self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"Queries not using their index: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('All hot queries use their indexes'))
+
+    def run(self, options):
+        rows, batch_size = options['rows'], options['batch_size']
+        self.stdout.write(f"Seeding {options['staff']} staff and {rows} activity log rows...")
+
+        departments = ['ICT', 'Finance', 'Logistics', 'Corporate Services', 'Audit']
+        Staff.objects.bulk_create([
+            Staff(
+                staff_id=f'BENCH{i:07d}', name=f'Bench Staff {i}', department=departments[i % len(departments)],
+                role='staff', email=f'bench{i}@example.com', status='active' if i % 10 else 'inactive'
+            )
+            for i in range(options['staff'])
+        ], batch_size=batch_size)
+        staff_ids = list(Staff.objects.filter(staff_id__startswith='BENCH').values_list('id', flat=True))
+
+        for start in range(0, rows, batch_size):
+            count = min(batch_size, rows - start)
+            ActivityLog.objects.bulk_create(
+                [ActivityLog(activity='Benchmark activity', created_by_id=random.choice(staff_ids)) for _ in range(count)],
+                batch_size=batch_size,
+            )
+
+        request_rows = max(rows // 10, 1)
+        for start in range(0, request_rows, batch_size):
+            creators = [random.choice(staff_ids) for _ in range(min(batch_size, request_rows - start))]
+            ItemRequest.objects.bulk_create([ItemRequest(items=[], created_by_id=c) for c in creators])
+            VehicleRequest.objects.bulk_create([
+                VehicleRequest(
+                    name='Bench', divison='ICT', vehicle_type='Bus', purpose='Benchmark', destination='Abuja',
+                    departure_date='2025-01-01', return_date='2025-01-02', duration_of_trip=1, created_by_id=c
+                )
+                for c in creators
+            ])
+            InventoryChecklist.objects.bulk_create([
+                InventoryChecklist(
+                    retail_outlet='Bench', retail_outlet_address='Abuja', pms_opening=0, product_recieved=0,
+                    price_range=0, pump_dispensing_level=0, created_by_id=c
+                )
+                for c in creators
+            ])
+
+        staff = Staff.objects.get(pk=random.choice(staff_ids))
+        failures = []
+        for label, queryset, index_names in hot_queries(staff):
+            used = uses_index(queryset, index_names)
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            status = self.style.SUCCESS('index') if used else self.style.ERROR('NO INDEX')
+            self.stdout.write(
+                f"{label:<32} {status:<10} median {timings[len(timings) // 2]:8.2f} ms  max {timings[-1]:8.2f} ms"
+            )
+            if not used:
+                failures.append(label)
+        return failures
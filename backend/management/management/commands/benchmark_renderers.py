@@ -0,0 +1,90 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from management.fastpath import get_list_plan
+from management.models import *
+from management.renderers import FastJSONParser, FastJSONRenderer, orjson
+from management.serializers import InventoryChecklistSerializer, VehicleRequestSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time serializing a list of vehicle requests and inventory checklists with the DRF "
+        "serializer and the list fast path (each including its query), then rendering and "
+        "parsing it with DRF's stdlib JSON renderer/parser and the orjson based ones. The "
+        "rows are seeded in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000, help='Rows seeded per model')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per step; the best is reported')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed: the fast pair falls back to the stdlib'))
+        try:
+            with transaction.atomic():
+                self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, options):
+        rows = options['rows']
+        staff = Staff.objects.create(
+            staff_id='RENDERBENCH', name='Render Bench', department='ICT', role='staff', email='renderbench@example.com'
+        )
+        VehicleRequest.objects.bulk_create([
+            VehicleRequest(
+                name=f'Bench {i}', divison='ICT', vehicle_type='Hilux', purpose='Site inspection', destination='Abuja',
+                departure_date='2026-01-05', return_date='2026-01-06', duration_of_trip=1, created_by=staff
+            )
+            for i in range(rows)
+        ], batch_size=2000)
+        InventoryChecklist.objects.bulk_create([
+            InventoryChecklist(
+                retail_outlet=f'Outlet {i % 50}', retail_outlet_address='Kano', pms_opening=i, product_recieved=i * 2,
+                price_range=617.5, pump_dispensing_level=i % 100, created_by=staff
+            )
+            for i in range(rows)
+        ], batch_size=2000)
+
+        for label, serializer_class in [('vehicle requests', VehicleRequestSerializer), ('inventory checklists', InventoryChecklistSerializer)]:
+            queryset = serializer_class.Meta.model.objects.filter(created_by=staff)
+            seconds, data = self.best(options['repeat'], lambda: serializer_class(list(queryset), many=True).data)
+            self.report(label, 'serialize drf', len(data), seconds)
+            render_rows = get_list_plan(serializer_class).renderer(serializer_class().fields)
+            columns = [field.name for field in queryset.model._meta.concrete_fields]
+            seconds, fast = self.best(options['repeat'], lambda: render_rows(queryset.values(*columns)))
+            self.report(label, 'serialize fast', len(fast), seconds)
+            if fast != data:
+                raise CommandError(f'The {label} fast path output differs from the serializer')
+
+            for name, renderer, parser in [('stdlib', JSONRenderer(), JSONParser()), ('fast', FastJSONRenderer(), FastJSONParser())]:
+                seconds, body = self.best(options['repeat'], lambda: renderer.render(data))
+                self.report(label, f'render {name}', len(data), seconds, len(body))
+                seconds, _ = self.best(options['repeat'], lambda: parser.parse(io.BytesIO(body)))
+                self.report(label, f'parse {name}', len(data), seconds, len(body))
+
+    def best(self, repeat, step):
+        timings, result = [], None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = step()
+            timings.append(time.perf_counter() - started)
+        return min(timings), result
+
+    def report(self, label, step, rows, seconds, size=None):
+        line = f"{label:<22} {step:<16} {rows / seconds:12,.0f} rows/s  {seconds * 1000:8.1f} ms"
+        if size is not None:
+            line += f"  {size / seconds / 1e6:8.1f} MB/s"
+        self.stdout.write(line)
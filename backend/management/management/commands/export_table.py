@@ -0,0 +1,30 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from management.export import EXPORTABLE_MODELS, export_rows, gzip_stream
+
+
+class Command(BaseCommand):
+    help = "Stream a management table to a file (or stdout) as CSV or JSONL, optionally gzip-compressed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=sorted(EXPORTABLE_MODELS))
+        parser.add_argument('--output', choices=['csv', 'jsonl'], default='csv')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--file', help='Destination path, defaults to stdout')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        model = EXPORTABLE_MODELS[options['table']]
+        chunks = export_rows(model.objects.all(), options['output'], chunk_size=options['chunk_size'])
+        if options['gzip']:
+            chunks = gzip_stream(chunks)
+
+        destination = open(options['file'], 'wb') if options['file'] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                destination.write(chunk)
+        finally:
+            if options['file']:
+                destination.close()
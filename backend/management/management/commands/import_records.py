@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from management.importers import IMPORTERS, ImportFormatError, get_import_settings, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk load staff or facilities from a CSV or Excel file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(IMPORTERS))
+        parser.add_argument('path')
+        parser.add_argument('--create-users', action='store_true', help='Create a user account for each staff row')
+        parser.add_argument('--chunk-size', type=int)
+        parser.add_argument(
+            '--hash-workers', type=int, help='Processes hashing user passwords (default: BULK_IMPORT HASH_WORKERS)'
+        )
+
+    def handle(self, *args, **options):
+        kwargs = {'chunk_size': options['chunk_size']}
+        if options['resource'] == 'staff':
+            kwargs['create_users'] = options['create_users']
+            kwargs['hash_workers'] = options['hash_workers'] or get_import_settings()['hash_workers']
+
+        with open(options['path'], 'rb') as file:
+            try:
+                result = IMPORTERS[options['resource']](read_rows(file, options['path']), **kwargs)
+            except ImportFormatError as e:
+                raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {result['created']} {options['resource']} rows"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from management.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Re-index every staff member, facility, vehicle request and activity log for full-text search."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} rows'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from management.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard rollup counters from the source tables."
+
+    def handle(self, *args, **options):
+        counters = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {counters} counters'))
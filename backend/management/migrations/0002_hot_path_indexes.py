@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['created_by', '-created_at'], name='activity_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['-created_at', '-id'], name='activity_created_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorychecklist',
+            index=models.Index(fields=['created_by', '-created_at'], name='inventory_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventorychecklist',
+            index=models.Index(fields=['-created_at', '-id'], name='inventory_created_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemrequest',
+            index=models.Index(fields=['created_by', '-created_at'], name='item_req_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemrequest',
+            index=models.Index(fields=['-created_at', '-id'], name='item_req_created_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['status', 'department'], name='staff_status_dept_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['department'], name='staff_department_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehiclerequest',
+            index=models.Index(fields=['created_by', '-created_at'], name='vehicle_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehiclerequest',
+            index=models.Index(fields=['-created_at', '-id'], name='vehicle_created_desc_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityLogArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('activity', models.CharField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='archived_activity_logs', to='management.staff')),
+            ],
+            options={
+                'db_table': 'activity_logs_archive',
+                'indexes': [models.Index(fields=['created_by', '-created_at'], name='archive_creator_created_idx'), models.Index(fields=['-created_at', '-id'], name='archive_created_desc_idx')],
+            },
+        ),
+    ]
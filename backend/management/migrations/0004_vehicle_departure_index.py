@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0003_activity_log_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehiclerequest',
+            index=models.Index(fields=['departure_date'], name='vehicle_departure_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0004_vehicle_departure_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facility',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
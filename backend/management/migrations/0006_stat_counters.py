@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0005_facility_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=255)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'stat_counters',
+                'constraints': [models.UniqueConstraint(fields=('metric', 'key'), name='stat_counter_metric_key_uniq')],
+            },
+        ),
+    ]
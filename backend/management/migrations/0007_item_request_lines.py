@@ -0,0 +1,78 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+# A frozen copy of management.item_lines as of this migration, so later
+# changes to it cannot alter what the backfill does
+def parse_quantity(value):
+    try:
+        return float(str(value).replace(',', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_items(items):
+    if not isinstance(items, list):
+        return []
+    lines = []
+    for position, item in enumerate(items):
+        if not isinstance(item, dict) or not str(item.get('description') or '').strip():
+            continue
+        lines.append({
+            'position': position,
+            'description': str(item['description']).strip()[:255],
+            'unit': str(item.get('unit') or '').strip()[:50],
+            'quantity': parse_quantity(item.get('quantity')),
+        })
+    return lines
+
+
+def build_lines(item_requests, line_model):
+    return [
+        line_model(item_request_id=item_request.pk, created_at=item_request.created_at, **line)
+        for item_request in item_requests
+        for line in parse_items(item_request.items)
+    ]
+
+
+def backfill_lines(apps, schema_editor):
+    ItemRequest = apps.get_model('management', 'ItemRequest')
+    ItemRequestLine = apps.get_model('management', 'ItemRequestLine')
+    last_pk = 0
+    while True:
+        batch = list(ItemRequest.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'items', 'created_at')[:BATCH_SIZE])
+        if not batch:
+            break
+        ItemRequestLine.objects.bulk_create(build_lines(batch, ItemRequestLine), batch_size=BATCH_SIZE)
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0006_stat_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemRequestLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('description', models.CharField(max_length=255)),
+                ('unit', models.CharField(blank=True, max_length=50)),
+                ('quantity', models.FloatField(null=True)),
+                ('created_at', models.DateTimeField()),
+                ('item_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='management.itemrequest')),
+            ],
+            options={
+                'db_table': 'item_request_lines',
+                'indexes': [models.Index(fields=['description', 'created_at'], name='item_line_desc_created_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_lines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+def backfill_stages(apps, schema_editor):
+    # One UPDATE per stage, in reverse order so each request ends at its first missing approval
+    VehicleRequest = apps.get_model('management', 'VehicleRequest')
+    VehicleRequest.objects.filter(
+        division_head_approval=True, corporate_service_approval=True, logistics_officer_approval=True
+    ).update(approval_stage='approved')
+    VehicleRequest.objects.filter(logistics_officer_approval=False).update(approval_stage='pending_logistics_officer')
+    VehicleRequest.objects.filter(corporate_service_approval=False).update(approval_stage='pending_corporate_service')
+    VehicleRequest.objects.filter(division_head_approval=False).update(approval_stage='pending_division_head')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0007_item_request_lines'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehiclerequest',
+            name='approval_stage',
+            field=models.CharField(choices=[('pending_division_head', 'Pending division head'), ('pending_corporate_service', 'Pending corporate service'), ('pending_logistics_officer', 'Pending logistics officer'), ('approved', 'Approved'), ('rejected', 'Rejected')], default='pending_division_head', max_length=30),
+        ),
+        migrations.RunPython(backfill_stages, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='vehiclerequest',
+            index=models.Index(fields=['approval_stage', '-created_at', '-id'], name='vehicle_stage_created_idx'),
+        ),
+    ]
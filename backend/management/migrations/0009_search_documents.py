@@ -0,0 +1,111 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:32
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# kind: (model name, title fields, body fields), frozen as of this migration
+SEARCH_SOURCES = {
+    'staff': ('Staff', ('name', 'staff_id'), ('department',)),
+    'facility': ('Facility', ('name', 'serial_no'), ('address',)),
+    'vehicle-request': ('VehicleRequest', ('purpose',), ('destination',)),
+    'activity-log': ('ActivityLog', ('activity',), ()),
+}
+
+SQLITE_INDEX = [
+    """CREATE VIRTUAL TABLE search_documents_fts USING fts5(
+        title, body, content='search_documents', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER search_documents_ai AFTER INSERT ON search_documents BEGIN
+        INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER search_documents_ad AFTER DELETE ON search_documents BEGIN
+        INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER search_documents_au AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO search_documents_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS search_documents_au',
+    'DROP TRIGGER IF EXISTS search_documents_ad',
+    'DROP TRIGGER IF EXISTS search_documents_ai',
+    'DROP TABLE IF EXISTS search_documents_fts',
+]
+
+POSTGRESQL_INDEX = [
+    """ALTER TABLE search_documents ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B')
+    ) STORED""",
+    'CREATE INDEX search_documents_vector_idx ON search_documents USING GIN (search_vector)',
+]
+
+POSTGRESQL_DROP = [
+    'DROP INDEX IF EXISTS search_documents_vector_idx',
+    'ALTER TABLE search_documents DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def run_statements(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+def join_fields(obj, fields, max_length=None):
+    text = ' '.join(str(value) for value in (getattr(obj, field) for field in fields) if value)
+    return text[:max_length] if max_length else text
+
+
+def backfill_index(apps, schema_editor):
+    SearchDocument = apps.get_model('management', 'SearchDocument')
+    for kind, (model_name, title_fields, body_fields) in SEARCH_SOURCES.items():
+        model = apps.get_model('management', model_name)
+        last_pk = 0
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', *title_fields, *body_fields)[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            SearchDocument.objects.bulk_create([
+                SearchDocument(
+                    kind=kind, object_id=obj.pk,
+                    title=join_fields(obj, title_fields, 512), body=join_fields(obj, body_fields),
+                )
+                for obj in batch
+            ])
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0008_vehicle_approval_stage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=30)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.CharField(max_length=512)),
+                ('body', models.TextField(blank=True)),
+            ],
+            options={
+                'db_table': 'search_documents',
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='search_document_object_uniq')],
+            },
+        ),
+        migrations.RunPython(
+            run_statements({'sqlite': SQLITE_INDEX, 'postgresql': POSTGRESQL_INDEX}),
+            run_statements({'sqlite': SQLITE_DROP, 'postgresql': POSTGRESQL_DROP}),
+        ),
+        migrations.RunPython(backfill_index, migrations.RunPython.noop),
+    ]
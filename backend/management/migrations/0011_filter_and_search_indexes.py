@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-18 13:12
+
+from django.db import migrations, models
+
+# ?search= runs case-insensitive prefix matches (name__istartswith). SQLite
+# only turns LIKE into an index range scan on a NOCASE index; PostgreSQL
+# matches UPPER(column::text) LIKE ..., which needs a pattern_ops index on
+# that expression. Neither can be declared in Meta.indexes portably.
+PREFIX_COLUMNS = [
+    ('staff_name_prefix_idx', 'staff', 'name'),
+    ('staff_staff_id_prefix_idx', 'staff', 'staff_id'),
+    ('facility_name_prefix_idx', 'facilities', 'name'),
+    ('facility_serial_prefix_idx', 'facilities', 'serial_no'),
+]
+
+CREATE_PREFIX_INDEXES = {
+    'sqlite': [f'CREATE INDEX {name} ON {table} ({column} COLLATE NOCASE)' for name, table, column in PREFIX_COLUMNS],
+    'postgresql': [
+        f'CREATE INDEX {name} ON {table} (UPPER({column}::text) text_pattern_ops)' for name, table, column in PREFIX_COLUMNS
+    ],
+}
+
+DROP_PREFIX_INDEXES = {
+    'sqlite': [f'DROP INDEX IF EXISTS {name}' for name, _, _ in PREFIX_COLUMNS],
+    'postgresql': [f'DROP INDEX IF EXISTS {name}' for name, _, _ in PREFIX_COLUMNS],
+}
+
+
+def run_statements(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0010_activity_log_owner_no_constraint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventorychecklist',
+            index=models.Index(fields=['retail_outlet', '-created_at', '-id'], name='inventory_outlet_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehiclerequest',
+            index=models.Index(condition=models.Q(('division_head_approval', True)), fields=['-created_at', '-id'], name='vehicle_div_head_yes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehiclerequest',
+            index=models.Index(condition=models.Q(('division_head_approval', False)), fields=['-created_at', '-id'], name='vehicle_div_head_no_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehiclerequest',
+            index=models.Index(condition=models.Q(('corporate_service_approval', True)), fields=['-created_at', '-id'], name='vehicle_corporate_yes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehiclerequest',
+            index=models.Index(condition=models.Q(('corporate_service_approval', False)), fields=['-created_at', '-id'], name='vehicle_corporate_no_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehiclerequest',
+            index=models.Index(condition=models.Q(('logistics_officer_approval', True)), fields=['-created_at', '-id'], name='vehicle_logistics_yes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehiclerequest',
+            index=models.Index(condition=models.Q(('logistics_officer_approval', False)), fields=['-created_at', '-id'], name='vehicle_logistics_no_idx'),
+        ),
+        migrations.RunPython(run_statements(CREATE_PREFIX_INDEXES), run_statements(DROP_PREFIX_INDEXES)),
+    ]
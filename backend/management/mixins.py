@@ -0,0 +1,292 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import permissions, serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from .cache import cache_models, recently_written
+from .conditional import last_modified, make_etag
+from .export import CONTENT_TYPES, export_filename, export_rows, gzip_stream
+from .fastpath import get_list_plan
+from .importers import IMPORTERS, ImportFormatError, get_import_settings, read_rows
+from .routers import has_replicas, replica_reads
+from .serializers import get_expand_fields, get_field_selection
+from .signals import post_bulk_create
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has been modified since it was fetched.'
+    default_code = 'precondition_failed'
+
+
+class ReplicaReadMixin:
+    """
+    Runs `list` and `retrieve` against a read replica when one is
+    configured, see management.routers. While the model, or one it has a
+    foreign key to, was written in the last REPLICA_READS MAX_LAG seconds,
+    they read from the primary instead: clients see their own writes, and
+    the response cached after a write is never filled from a lagging replica.
+    """
+
+    def use_replica(self):
+        return has_replicas() and not recently_written(cache_models(self.get_queryset().model))
+
+    def list(self, request, *args, **kwargs):
+        with replica_reads(self.use_replica()):
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        with replica_reads(self.use_replica()):
+            return super().retrieve(request, *args, **kwargs)
+
+
+class SparseFieldsMixin:
+    """
+    With `?fields=`/`?exclude=`, reads load only the columns the selected
+    serializer fields come from, plus the primary key, `updated_at` and the
+    ordering columns pagination and validators need. `?compact=true` on a
+    list answers `{"fields": [...], "results": [[...], ...]}` with each row
+    as a positional array instead of repeating the keys.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        wanted, excluded = get_field_selection(self.request)
+        if self.action in ('list', 'retrieve') and (wanted is not None or excluded):
+            queryset = queryset.only(*self.get_loaded_fields(queryset.model))
+        return queryset
+
+    def get_loaded_fields(self, model):
+        columns = {field.name for field in model._meta.concrete_fields}
+        ordering = [*getattr(self.pagination_class, 'ordering', ()), *(getattr(self, 'ordering', None) or ())]
+        if isinstance(getattr(self, 'ordering_fields', None), (list, tuple)):
+            ordering += self.ordering_fields
+        names = {model._meta.pk.name, 'updated_at', *(field.lstrip('-') for field in ordering)}
+        names |= get_expand_fields(self.request)
+        for field in self.get_serializer().fields.values():
+            names.add(field.source.split('.')[0])
+        return sorted(names & columns)
+
+    def is_compact(self):
+        return self.request.query_params.get('compact') in ('1', 'true')
+
+    def get_paginated_response(self, data):
+        if not self.is_compact():
+            return super().get_paginated_response(data)
+        fields = list(self.get_serializer().fields)
+        response = super().get_paginated_response([[row[name] for name in fields] for row in data])
+        page = dict(response.data)
+        results = page.pop('results')
+        response.data = {**page, 'fields': fields, 'results': results}
+        return response
+
+
+class FastListMixin:
+    """
+    Serves `list` from `values()` rows turned into the serializer's output by
+    a plan compiled once per serializer, skipping model instances and DRF's
+    per-field machinery, see management.fastpath. Responses are identical;
+    selections the plan cannot render (hyperlinked `url`, `?expand=`) go
+    through the serializer. Needs ConditionalRequestMixin and
+    SparseFieldsMixin after it.
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer_fields = self.get_serializer().fields
+        renderer = get_list_plan(self.get_serializer_class()).renderer(serializer_fields)
+        if renderer is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = queryset.values(*self.get_loaded_fields(queryset.model))
+        return self.conditional_list(request, queryset, renderer)
+
+
+class ConditionalRequestMixin:
+    """
+    Conditional request support driven by `updated_at`.
+
+    `list` and `retrieve` answer with `ETag` and `Last-Modified` validators
+    and reply 304 Not Modified, without serializing anything, when the
+    client's `If-None-Match`/`If-Modified-Since` still match. Writes honour
+    `If-Match`/`If-Unmodified-Since` and fail with 412 when the object has
+    changed since the client fetched it.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, modified = make_etag(request, type(instance), [instance]), last_modified([instance])
+        not_modified = get_conditional_response(request, etag=etag, last_modified=modified)
+        if not_modified is not None:
+            return self.set_validators(not_modified, etag, modified)
+        response = Response(self.get_serializer(instance).data)
+        return self.set_validators(response, etag, modified)
+
+    def list(self, request, *args, **kwargs):
+        serialize = lambda objects: self.get_serializer(objects, many=True).data
+        return self.conditional_list(request, self.filter_queryset(self.get_queryset()), serialize)
+
+    def conditional_list(self, request, queryset, serialize):
+        page = self.paginate_queryset(queryset)
+        objects = page if page is not None else list(queryset)
+
+        # Deleting a row never moves the newest `updated_at`, so only the
+        # ETag (which covers the ids) is trusted for lists.
+        etag = make_etag(request, queryset.model, objects)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return self.set_validators(not_modified, etag, last_modified(objects))
+
+        data = serialize(objects)
+        if page is not None:
+            response = self.get_paginated_response(data)
+        else:
+            response = Response(data)
+        return self.set_validators(response, etag, last_modified(objects))
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.request.method not in permissions.SAFE_METHODS:
+            failed = get_conditional_response(
+                self.request,
+                etag=make_etag(self.request, type(instance), [instance]),
+                last_modified=last_modified([instance]),
+            )
+            if failed is not None:
+                raise PreconditionFailed()
+        return instance
+
+    def set_validators(self, response, etag, modified):
+        response['ETag'] = etag
+        if modified is not None:
+            response['Last-Modified'] = http_date(modified)
+        return response
+
+
+class BulkCreateMixin:
+    """
+    Adds `POST <resource>/bulk/` which accepts a list of objects, validates
+    them in one pass and inserts them with a single `bulk_create` inside one
+    transaction. Either every item is created or none is, and the response
+    carries the errors of each rejected item by position.
+    """
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'Expected a non-empty list of items.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_items = getattr(settings, 'BULK_MAX_ITEMS', 500)
+        if len(items) > max_items:
+            return Response(
+                {'detail': f'A batch may contain at most {max_items} items.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        context['related_objects'] = self.get_bulk_related_objects(serializer_class(context=context), items)
+
+        objects, errors = [], []
+        for item in items:
+            serializer = serializer_class(data=item, context=context)
+            if serializer.is_valid():
+                objects.append(self.build_bulk_object(serializer_class.Meta.model, serializer.validated_data))
+                errors.append({})
+            else:
+                errors.append(serializer.errors)
+
+        if any(errors):
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        model = serializer_class.Meta.model
+        with transaction.atomic():
+            created = model.objects.bulk_create(objects)
+            post_bulk_create.send(sender=model, instances=created)
+
+        return Response(serializer_class(created, many=True, context=context).data, status=status.HTTP_201_CREATED)
+
+    def build_bulk_object(self, model, validated_data):
+        return model(**validated_data)
+
+    def get_bulk_related_objects(self, serializer, items):
+        """
+        Resolve every primary key referenced by the batch with one query per
+        related field instead of one query per item.
+        """
+        related = {}
+        for name, field in serializer.fields.items():
+            if field.read_only or not isinstance(field, serializers.PrimaryKeyRelatedField):
+                continue
+            pks = {str(item[name]) for item in items if isinstance(item, dict) and isinstance(item.get(name), (int, str))}
+            pks = [pk for pk in pks if pk.isdigit()]
+            related[name] = {str(pk): obj for pk, obj in field.get_queryset().in_bulk(pks).items()}
+        return related
+
+
+class ExportMixin:
+    """
+    Adds `GET <resource>/export/?output=csv|jsonl&gzip=1`, which streams every
+    row matching the list filters. Nothing is buffered server side: rows are
+    read in chunks and encoded as they are sent.
+    """
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in CONTENT_TYPES:
+            return Response(
+                {'output': f"Expected one of: {', '.join(CONTENT_TYPES)}."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        compress = request.query_params.get('gzip') in ('1', 'true')
+
+        queryset = self.filter_queryset(self.get_queryset())
+        chunks = export_rows(queryset, output, chunk_size=getattr(settings, 'EXPORT_CHUNK_SIZE', 2000))
+        if compress:
+            chunks = gzip_stream(chunks)
+
+        response = StreamingHttpResponse(chunks, content_type='application/gzip' if compress else CONTENT_TYPES[output])
+        response['Content-Disposition'] = f'attachment; filename="{export_filename(self.basename, output, compress)}"'
+        return response
+
+
+class ImportMixin:
+    """
+    Adds `POST <resource>/import/` (admins only), which loads the rows of an
+    uploaded CSV or Excel file in chunks and reports the rows it skipped.
+    Staff imports create linked user accounts with `?create_users=true`; each
+    password is hashed in the request, so those files are limited to
+    BULK_IMPORT `HTTP_USER_ROWS` rows and larger ones go through the
+    `import_records` command.
+    """
+
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[permissions.IsAdminUser])
+    def import_rows(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': 'Upload a CSV or Excel file.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        options = {}
+        if request.query_params.get('create_users') in ('1', 'true'):
+            options['create_users'] = True
+        try:
+            rows = read_rows(upload, upload.name)
+            if options.get('create_users'):
+                limit = get_import_settings()['http_user_rows']
+                rows = list(islice(rows, limit + 1))
+                if len(rows) > limit:
+                    return Response({'file': (
+                        f'Imports creating user accounts are limited to {limit} rows; use '
+                        f'`python manage.py import_records {self.basename} <file> --create-users` for larger files.'
+                    )}, status=status.HTTP_400_BAD_REQUEST)
+            result = IMPORTERS[self.basename](rows, **options)
+        except ImportFormatError as e:
+            return Response({'file': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
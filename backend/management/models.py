@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 
 class Staff(models.Model):
     STATUS_CHOICES = (
@@ -21,6 +22,10 @@ class Staff(models.Model):
     class Meta:
         db_table = 'staff'
         verbose_name_plural = 'Staff'
+        indexes = [
+            models.Index(fields=['status', 'department'], name='staff_status_dept_idx'),
+            models.Index(fields=['department'], name='staff_department_idx'),
+        ]
 
 
 class ItemRequest(models.Model):
@@ -31,9 +36,47 @@ class ItemRequest(models.Model):
     
     class Meta:
         db_table = 'item_requests'
+        indexes = [
+            models.Index(fields=['created_by', '-created_at'], name='item_req_creator_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='item_req_created_desc_idx'),
+        ]
+
+
+class ItemRequestLine(models.Model):
+    """
+    One entry of `ItemRequest.items`, kept in sync by management.item_lines so
+    item totals can be aggregated in SQL. `created_at` is copied from the
+    request so date filtered totals need no join.
+    """
+    item_request = models.ForeignKey(ItemRequest, on_delete=models.CASCADE, related_name='lines')
+    position = models.PositiveIntegerField()
+    description = models.CharField(max_length=255)
+    unit = models.CharField(max_length=50, blank=True)
+    quantity = models.FloatField(null=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'item_request_lines'
+        indexes = [
+            models.Index(fields=['description', 'created_at'], name='item_line_desc_created_idx'),
+        ]
 
 
 class VehicleRequest(models.Model):
+    STAGE_CHOICES = (
+        ('pending_division_head', 'Pending division head'),
+        ('pending_corporate_service', 'Pending corporate service'),
+        ('pending_logistics_officer', 'Pending logistics officer'),
+        ('approved', 'Approved'),
+        ('rejected', 'Rejected'),
+    )
+    # Each pending stage and the approval flag that completes it, in order
+    APPROVAL_FLAGS = (
+        ('pending_division_head', 'division_head_approval'),
+        ('pending_corporate_service', 'corporate_service_approval'),
+        ('pending_logistics_officer', 'logistics_officer_approval'),
+    )
+
     name = models.CharField(max_length=255)
     divison = models.CharField(max_length=255)
     vehicle_type = models.CharField(max_length=255)
@@ -45,12 +88,43 @@ class VehicleRequest(models.Model):
     division_head_approval = models.BooleanField(default=False)
     corporate_service_approval = models.BooleanField(default=False)
     logistics_officer_approval = models.BooleanField(default=False)
+    approval_stage = models.CharField(max_length=30, choices=STAGE_CHOICES, default='pending_division_head')
     created_by = models.ForeignKey(Staff, on_delete=models.CASCADE, related_name='vehicle_requests')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    def sync_approval_stage(self):
+        """
+        Derive `approval_stage` from the approval flags; a rejected request
+        stays rejected.
+        """
+        if self.approval_stage != 'rejected':
+            self.approval_stage = next(
+                (stage for stage, flag in self.APPROVAL_FLAGS if not getattr(self, flag)), 'approved'
+            )
+
+    def save(self, *args, **kwargs):
+        self.sync_approval_stage()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'approval_stage'}
+        super().save(*args, **kwargs)
     
     class Meta:
         db_table = 'vehicle_requests'
+        indexes = [
+            models.Index(fields=['created_by', '-created_at'], name='vehicle_creator_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='vehicle_created_desc_idx'),
+            models.Index(fields=['departure_date'], name='vehicle_departure_idx'),
+            models.Index(fields=['approval_stage', '-created_at', '-id'], name='vehicle_stage_created_idx'),
+            # Approval flag filters; partial because SQLite cannot range scan
+            # an index on a boolean column for `WHERE flag`
+            models.Index(fields=['-created_at', '-id'], condition=Q(division_head_approval=True), name='vehicle_div_head_yes_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=Q(division_head_approval=False), name='vehicle_div_head_no_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=Q(corporate_service_approval=True), name='vehicle_corporate_yes_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=Q(corporate_service_approval=False), name='vehicle_corporate_no_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=Q(logistics_officer_approval=True), name='vehicle_logistics_yes_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=Q(logistics_officer_approval=False), name='vehicle_logistics_no_idx'),
+        ]
 
 
 class InventoryChecklist(models.Model):
@@ -66,16 +140,50 @@ class InventoryChecklist(models.Model):
     
     class Meta:
         db_table = 'inventory_checklists'
+        indexes = [
+            models.Index(fields=['created_by', '-created_at'], name='inventory_creator_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='inventory_created_desc_idx'),
+            models.Index(fields=['retail_outlet', '-created_at', '-id'], name='inventory_outlet_created_idx'),
+        ]
 
 
 class ActivityLog(models.Model):
     activity = models.CharField()
-    created_by = models.ForeignKey(Staff, on_delete=models.DO_NOTHING, related_name='activity_logs')
+    # Audit rows outlive the staff member, like their archived copies
+    created_by = models.ForeignKey(
+        Staff, on_delete=models.DO_NOTHING, db_constraint=False, related_name='activity_logs'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'activity_logs'
+        indexes = [
+            models.Index(fields=['created_by', '-created_at'], name='activity_creator_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='activity_created_desc_idx'),
+        ]
+
+
+class ActivityLogArchive(models.Model):
+    """
+    Activity log rows moved out of `activity_logs` by the archival job.
+    Rows keep their original primary key.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    activity = models.CharField()
+    created_by = models.ForeignKey(
+        Staff, on_delete=models.DO_NOTHING, db_constraint=False, related_name='archived_activity_logs'
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'activity_logs_archive'
+        indexes = [
+            models.Index(fields=['created_by', '-created_at'], name='archive_creator_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='archive_created_desc_idx'),
+        ]
 
 
 class Facility(models.Model):
@@ -83,7 +191,43 @@ class Facility(models.Model):
     address = models.CharField()
     serial_no = models.CharField(max_length=255)
     take_over = models.CharField(default='Nill', null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'facilities'
-        verbose_name_plural = 'Facilities'
\ No newline at end of file
+        verbose_name_plural = 'Facilities'
+
+
+class StatCounter(models.Model):
+    """
+    Precomputed dashboard count, e.g. metric `vehicle_requests.stage`, key
+    `pending_division_head`. Kept current by signal receivers, see
+    management.stats.
+    """
+    metric = models.CharField(max_length=100)
+    key = models.CharField(max_length=255)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'stat_counters'
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'key'], name='stat_counter_metric_key_uniq'),
+        ]
+
+
+class SearchDocument(models.Model):
+    """
+    Searchable text of one Staff, Facility, VehicleRequest or ActivityLog row,
+    maintained by management.search. The full-text index over it is created
+    by migration: an FTS5 table on SQLite, a tsvector column on PostgreSQL.
+    """
+    kind = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    title = models.CharField(max_length=512)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'search_documents'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='search_document_object_uniq'),
+        ]
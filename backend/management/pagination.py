@@ -0,0 +1,38 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    The `id` tie-breaker keeps the ordering stable when several rows share
+    the same `created_at`, so every page is a single indexed range scan no
+    matter how deep the client pages.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 50)
+        self.max_page_size = getattr(settings, 'MAX_PAGE_SIZE', 500)
+
+
+class IdCursorPagination(CreatedAtCursorPagination):
+    """
+    Keyset pagination for tables without a `created_at` column (facilities).
+    """
+    ordering = ('-id',)
+
+
+
+class SearchPagination(PageNumberPagination):
+    """
+    Page numbers for ranked search results, which have no stable key to
+    put in a cursor.
+    """
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 50)
+        self.max_page_size = getattr(settings, 'MAX_PAGE_SIZE', 500)
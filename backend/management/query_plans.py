@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import *
+
+
+def hot_queries(staff):
+    """
+    The listing and lookup queries the API runs most often, each paired with
+    the index (or indexes, per database backend) it is expected to use.
+    `staff` is any existing Staff row.
+
+    The login lookup is answered by the unique index on `staff_id` or `email`;
+    a composite (staff_id, department, email) index would never be chosen over them.
+    """
+    month_ago = timezone.now() - timedelta(days=30)
+    return [
+        ('activity log page', ActivityLog.objects.order_by('-created_at', '-id')[:50], 'activity_created_desc_idx'),
+        ('activity log by staff', ActivityLog.objects.filter(created_by=staff).order_by('-created_at')[:50], 'activity_creator_created_idx'),
+        ('item requests by staff', ItemRequest.objects.filter(created_by=staff).order_by('-created_at')[:50], 'item_req_creator_created_idx'),
+        ('vehicle requests by staff', VehicleRequest.objects.filter(created_by=staff).order_by('-created_at')[:50], 'vehicle_creator_created_idx'),
+        ('checklists by staff', InventoryChecklist.objects.filter(created_by=staff).order_by('-created_at')[:50], 'inventory_creator_created_idx'),
+        ('approval queue', VehicleRequest.objects.filter(approval_stage='pending_corporate_service').order_by('-created_at', '-id')[:50], 'vehicle_stage_created_idx'),
+        ('totals of one item', ItemRequestLine.objects.filter(description='A4 paper', created_at__gte=month_ago).values('unit').annotate(Sum('quantity')), 'item_line_desc_created_idx'),
+        ('item totals since a date', ItemRequestLine.objects.filter(created_at__gte=month_ago).values('description').annotate(Sum('quantity')), 'item_line_desc_created_idx'),
+        ('staff by status and department', Staff.objects.filter(status='active', department=staff.department), 'staff_status_dept_idx'),
+        ('staff by department', Staff.objects.filter(department=staff.department), 'staff_department_idx'),
+        ('staff name search', Staff.objects.filter(name__istartswith='ami'), 'staff_name_prefix_idx'),
+        ('staff id search', Staff.objects.filter(staff_id__istartswith='nm0'), 'staff_staff_id_prefix_idx'),
+        ('facility name search', Facility.objects.filter(name__istartswith='kano'), 'facility_name_prefix_idx'),
+        ('facility serial search', Facility.objects.filter(serial_no__istartswith='fac'), 'facility_serial_prefix_idx'),
+        ('checklists by outlet', InventoryChecklist.objects.filter(retail_outlet='Outlet').order_by('-created_at', '-id')[:50], 'inventory_outlet_created_idx'),
+        ('requests by approval flag', VehicleRequest.objects.filter(division_head_approval=True).order_by('-created_at', '-id')[:50], 'vehicle_div_head_yes_idx'),
+        ('requests missing an approval', VehicleRequest.objects.filter(logistics_officer_approval=False).order_by('-created_at', '-id')[:50], 'vehicle_logistics_no_idx'),
+        ('staff login lookup', Staff.objects.filter(staff_id=staff.staff_id, department=staff.department, email=staff.email), ('sqlite_autoindex_staff_', 'staff_staff_id_key', 'staff_email_key')),
+    ]
+
+
+def uses_index(queryset, index_names):
+    if isinstance(index_names, str):
+        index_names = (index_names,)
+    plan = queryset.explain()
+    return any(name in plan for name in index_names)
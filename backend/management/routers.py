@@ -0,0 +1,60 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def get_replica_settings():
+    config = getattr(settings, 'REPLICA_READS', {})
+    return {
+        'max_lag': config.get('MAX_LAG', 5),
+    }
+
+
+def has_replicas():
+    return any(alias.startswith('replica_') for alias in settings.DATABASES)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """
+    Route the reads of `management` models made inside the block to a
+    read replica, when one is configured and `enabled`.
+    """
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Sends reads of `management` models to a random `replica_*` database
+    inside `replica_reads()`; every other query, and all writes and
+    migrations, use `default`. Replicas lag the primary slightly, so only
+    list/retrieve requests opt in, and not for models written in the last
+    REPLICA_READS MAX_LAG seconds (see management.cache.recently_written).
+    """
+    app_labels = {'management'}
+
+    def __init__(self):
+        self.replicas = [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+    def db_for_read(self, model, **hints):
+        if self.replicas and _replica_reads.get() and model._meta.app_label in self.app_labels:
+            return random.choice(self.replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,167 @@
+import re
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import Q
+
+from .models import SearchDocument
+
+# kind: (model label, title fields, body fields). Title matches rank higher.
+SEARCH_SOURCES = {
+    'staff': ('management.Staff', ('name', 'staff_id'), ('department',)),
+    'facility': ('management.Facility', ('name', 'serial_no'), ('address',)),
+    'vehicle-request': ('management.VehicleRequest', ('purpose',), ('destination',)),
+    'activity-log': ('management.ActivityLog', ('activity',), ()),
+}
+
+KINDS = {label: kind for kind, (label, _, _) in SEARCH_SOURCES.items()}
+
+# bm25 weights of the title and body columns
+FTS_WEIGHTS = (10.0, 1.0)
+
+
+def kind_of(model):
+    return KINDS.get(model._meta.label)
+
+
+def join_fields(obj, fields, max_length=None):
+    text = ' '.join(str(value) for value in (getattr(obj, field) for field in fields) if value)
+    return text[:max_length] if max_length else text
+
+
+def build_documents(kind, objects):
+    _, title_fields, body_fields = SEARCH_SOURCES[kind]
+    return [
+        SearchDocument(
+            kind=kind, object_id=obj.pk, title=join_fields(obj, title_fields, 512), body=join_fields(obj, body_fields)
+        )
+        for obj in objects
+    ]
+
+
+def index_objects(model, objects):
+    """
+    Insert or refresh the search documents of `objects` in one statement.
+    """
+    documents = build_documents(kind_of(model), objects)
+    if documents:
+        SearchDocument.objects.bulk_create(
+            documents, update_conflicts=True, unique_fields=['kind', 'object_id'], update_fields=['title', 'body']
+        )
+
+
+def remove_objects(model, pks):
+    SearchDocument.objects.filter(kind=kind_of(model), object_id__in=pks).delete()
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Re-index every searchable row in primary key batches.
+    """
+    indexed = 0
+    for kind, (label, title_fields, body_fields) in SEARCH_SOURCES.items():
+        model = apps.get_model(label)
+        last_pk = 0
+        while True:
+            batch = list(
+                model.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', *title_fields, *body_fields)[:batch_size]
+            )
+            if not batch:
+                break
+            SearchDocument.objects.bulk_create(
+                build_documents(kind, batch),
+                update_conflicts=True, unique_fields=['kind', 'object_id'], update_fields=['title', 'body'],
+            )
+            indexed += len(batch)
+            last_pk = batch[-1].pk
+    return indexed
+
+
+def query_terms(text):
+    return re.findall(r'\w+', text.lower())
+
+
+class SearchResults:
+    """
+    Ranked matches for `text`, every term matching as a prefix. Supports
+    `count()` and slicing so it can be handed to a Django Paginator; each
+    slice runs one LIMIT/OFFSET query against the full-text index.
+    """
+
+    def __init__(self, text, kinds=None):
+        self.terms = query_terms(text)
+        self.kinds = list(kinds or [])
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            if not self.terms:
+                self._count = 0
+            elif connection.vendor in ('sqlite', 'postgresql'):
+                sql, params = self.sql('SELECT COUNT(*)')
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    self._count = cursor.fetchone()[0]
+            else:
+                self._count = self.fallback_queryset().count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if not self.terms or (stop is not None and stop <= start):
+            return []
+
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            documents = self.fallback_queryset()[start:stop]
+            return [self.result(d.kind, d.object_id, d.title, d.body, 0.0) for d in documents]
+
+        if connection.vendor == 'sqlite':
+            select = f'SELECT d.kind, d.object_id, d.title, d.body, -bm25(search_documents_fts, {FTS_WEIGHTS[0]}, {FTS_WEIGHTS[1]}) AS score'
+        else:
+            select = "SELECT d.kind, d.object_id, d.title, d.body, ts_rank(d.search_vector, to_tsquery('simple', %s)) AS score"
+        sql, params = self.sql(select)
+        if connection.vendor == 'postgresql':
+            params = [self.match_expression()] + params
+        sql += ' ORDER BY score DESC, d.id LIMIT %s OFFSET %s'
+        params += [-1 if stop is None else stop - start, start]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [self.result(*row) for row in cursor.fetchall()]
+
+    def match_expression(self):
+        if connection.vendor == 'sqlite':
+            return ' '.join(f'"{term}"*' for term in self.terms)
+        return ' & '.join(f'{term}:*' for term in self.terms)
+
+    def sql(self, select):
+        if connection.vendor == 'sqlite':
+            sql = (
+                f'{select} FROM search_documents_fts '
+                'JOIN search_documents d ON d.id = search_documents_fts.rowid '
+                'WHERE search_documents_fts MATCH %s'
+            )
+        else:
+            sql = f"{select} FROM search_documents d WHERE d.search_vector @@ to_tsquery('simple', %s)"
+        params = [self.match_expression()]
+        if self.kinds:
+            sql += f" AND d.kind IN ({', '.join(['%s'] * len(self.kinds))})"
+            params += self.kinds
+        return sql, params
+
+    def fallback_queryset(self):
+        # No full-text index on this backend: substring matching, unranked
+        queryset = SearchDocument.objects.all()
+        if self.kinds:
+            queryset = queryset.filter(kind__in=self.kinds)
+        for term in self.terms:
+            queryset = queryset.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        return queryset.order_by('kind', 'object_id')
+
+    @staticmethod
+    def result(kind, object_id, title, body, score):
+        return {'type': kind, 'id': object_id, 'title': title, 'body': body, 'score': float(score)}
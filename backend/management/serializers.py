@@ -1,32 +1,164 @@
 from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
 from .models import *
 
-class StaffSerializer(serializers.HyperlinkedModelSerializer):
+
+def get_expand_fields(request):
+    """
+    Return the relations requested through `?expand=a,b` on a read request.
+    """
+    if request is None or request.method != 'GET':
+        return set()
+    return {field.strip() for field in request.query_params.get('expand', '').split(',') if field.strip()}
+
+
+def get_field_selection(request):
+    """
+    Return the `(fields, exclude)` names of a read request's `?fields=a,b`
+    and `?exclude=c` parameters; `fields` is None when not given.
+    """
+    if request is None or request.method != 'GET':
+        return None, set()
+    split = lambda param: {name.strip() for name in request.query_params.get(param, '').split(',') if name.strip()}
+    return (split('fields') if 'fields' in request.query_params else None), split('exclude')
+
+
+class FieldSelectionMixin:
+    """
+    Render only the fields named in `?fields=`, minus those in `?exclude=`.
+    Unknown names answer 400. The ViewSet defers the unused columns, see
+    management.mixins.SparseFieldsMixin.
+    """
+    def get_fields(self):
+        fields = super().get_fields()
+        wanted, excluded = get_field_selection(self.context.get('request'))
+        unknown = sorted(((wanted or set()) | excluded) - set(fields))
+        if unknown:
+            raise ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}. Expected: {', '.join(fields)}."})
+        return {
+            name: field for name, field in fields.items()
+            if (wanted is None or name in wanted) and name not in excluded
+        }
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that resolves against objects preloaded into the
+    serializer context under `related_objects[<field name>]`, falling back to
+    a database lookup when nothing was preloaded (bulk endpoints preload).
+    """
+    def to_internal_value(self, data):
+        preloaded = self.context.get('related_objects', {}).get(self.field_name)
+        if preloaded is None or isinstance(data, bool) or not isinstance(data, (int, str)):
+            return super().to_internal_value(data)
+        try:
+            return preloaded[str(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
+
+class StaffSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Staff
+        fields = ['id', 'staff_id', 'name', 'department', 'role', 'email']
+        read_only_fields = fields
+
+
+class CreatedByExpansionMixin:
+    """
+    Render `created_by` as a nested staff summary when the client asks for
+    `?expand=created_by`. The ViewSet joins the staff row in the same query.
+    """
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'created_by' in get_expand_fields(self.context.get('request')):
+            fields['created_by'] = StaffSummarySerializer(read_only=True)
+        return fields
+
+
+class StaffSerializer(FieldSelectionMixin, serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Staff
         fields = "__all__"
 
-class ItemRequestSerializer(serializers.ModelSerializer):
+class ItemRequestSerializer(FieldSelectionMixin, CreatedByExpansionMixin, serializers.ModelSerializer):
+    serializer_related_field = CachedPrimaryKeyRelatedField
+
     class Meta:
         model = ItemRequest
         fields = "__all__"
 
-class VehicleRequestSerializer(serializers.ModelSerializer):
+class VehicleRequestSerializer(FieldSelectionMixin, CreatedByExpansionMixin, serializers.ModelSerializer):
+    serializer_related_field = CachedPrimaryKeyRelatedField
+
     class Meta:
         model = VehicleRequest
         fields = "__all__"
+        # Stages only move through the approve/reject actions, see management.workflow
+        read_only_fields = ['approval_stage', *(flag for _, flag in VehicleRequest.APPROVAL_FLAGS)]
+
+    def to_internal_value(self, data):
+        """
+        Reject writes that would change the approval fields instead of
+        dropping them silently. Sending their current values (e.g. `false`
+        flags on create) is accepted.
+        """
+        if isinstance(data, dict):
+            changed = [name for name in self.Meta.read_only_fields if name in data and self.changes(name, data[name])]
+            if changed:
+                message = 'Approvals only change through POST /api/v1/vehicle-request/{id}/approve/ or /reject/.'
+                raise ValidationError({name: [message] for name in changed})
+        return super().to_internal_value(data)
+
+    def changes(self, name, value):
+        if self.instance is not None:
+            current = getattr(self.instance, name)
+        else:
+            current = VehicleRequest._meta.get_field(name).get_default()
+        if name != 'approval_stage':
+            try:
+                value = serializers.BooleanField().to_internal_value(value)
+            except ValidationError:
+                return True
+        return value != current
+
+class InventoryChecklistSerializer(FieldSelectionMixin, CreatedByExpansionMixin, serializers.ModelSerializer):
+    serializer_related_field = CachedPrimaryKeyRelatedField
 
-class InventoryChecklistSerializer(serializers.ModelSerializer):
     class Meta:
         model = InventoryChecklist
         fields = "__all__"
 
-class ActivityLogSerializer(serializers.ModelSerializer):
+class ActivityLogSerializer(FieldSelectionMixin, CreatedByExpansionMixin, serializers.ModelSerializer):
     class Meta:
         model = ActivityLog
         fields = "__all__"
 
-class FacilitySerializer(serializers.ModelSerializer):
+class StaffImportSerializer(serializers.Serializer):
+    """
+    Validates one row of a staff import. Uniqueness of `staff_id` and `email`
+    is checked by the importer for a whole chunk at once, not per row.
+    """
+    staff_id = serializers.CharField(max_length=255)
+    name = serializers.CharField(max_length=255)
+    department = serializers.CharField(max_length=255)
+    role = serializers.CharField(max_length=30)
+    email = serializers.EmailField(max_length=255)
+    status = serializers.ChoiceField(choices=Staff.STATUS_CHOICES, default='active')
+    password = serializers.CharField(min_length=6, required=False, write_only=True)
+
+    def to_internal_value(self, data):
+        # Spreadsheets leave empty cells as empty strings
+        data = {key: value for key, value in data.items() if key and value not in ('', None)}
+        return super().to_internal_value(data)
+
+class ActivityLogArchiveSerializer(FieldSelectionMixin, CreatedByExpansionMixin, serializers.ModelSerializer):
+    class Meta:
+        model = ActivityLogArchive
+        fields = ['id', 'activity', 'created_at', 'updated_at', 'created_by']
+        read_only_fields = fields
+
+class FacilitySerializer(FieldSelectionMixin, serializers.ModelSerializer):
     class Meta:
         model = Facility
         fields = "__all__"
@@ -0,0 +1,190 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .activity import log_activity
+from .cache import invalidate
+from .feed import FEED_KINDS, events_for, publish_on_commit
+from .item_lines import create_lines, sync_lines
+from .models import *
+from .search import index_objects, remove_objects
+from .stats import (
+    TRACKED_FIELDS, instance_values, move_creator_counts, stored_values, track_bulk_create, track_change
+)
+from .typeahead import TYPEAHEAD_SOURCES, get_typeahead
+
+# Sent after a batch of rows is inserted with `bulk_create`, which bypasses
+# the per-instance `post_save` signal. Arguments: `sender` (the model class)
+# and `instances` (the created objects, primary keys populated).
+post_bulk_create = Signal()
+
+AUDITED_REQUEST_MODELS = (ItemRequest, VehicleRequest, InventoryChecklist)
+
+
+def describe(instance):
+    return f"{instance._meta.verbose_name.capitalize()} #{instance.pk}"
+
+
+@receiver(post_save, sender=Staff)
+def audit_staff_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    action = 'created' if created else 'updated'
+    log_activity(instance.pk, f"Staff {instance.name} ({instance.staff_id}) {action}")
+
+
+def audit_request_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    log_activity(instance.created_by_id, f"{describe(instance)} {'created' if created else 'updated'}")
+
+
+def audit_request_delete(sender, instance, **kwargs):
+    log_activity(instance.created_by_id, f"{describe(instance)} deleted")
+
+
+def audit_request_bulk_create(sender, instances, **kwargs):
+    for instance in instances:
+        log_activity(instance.created_by_id, f"{describe(instance)} created")
+
+
+for model in AUDITED_REQUEST_MODELS:
+    post_save.connect(audit_request_save, sender=model, dispatch_uid=f'audit_save_{model._meta.model_name}')
+    post_delete.connect(audit_request_delete, sender=model, dispatch_uid=f'audit_delete_{model._meta.model_name}')
+    post_bulk_create.connect(audit_request_bulk_create, sender=model, dispatch_uid=f'audit_bulk_{model._meta.model_name}')
+
+
+# Response cache invalidation. ActivityLog deletes are left out on purpose:
+# a post_delete receiver would stop the archival job from deleting rows
+# with a single DELETE, so the archive job and the ViewSet invalidate
+# explicitly instead.
+def invalidate_cached_responses(sender, **kwargs):
+    invalidate(sender)
+
+
+CACHED_MODELS = (Staff, ItemRequest, VehicleRequest, InventoryChecklist, Facility)
+
+for model in CACHED_MODELS + (ActivityLog,):
+    post_save.connect(invalidate_cached_responses, sender=model, dispatch_uid=f'cache_save_{model._meta.model_name}')
+    post_bulk_create.connect(invalidate_cached_responses, sender=model, dispatch_uid=f'cache_bulk_{model._meta.model_name}')
+
+for model in CACHED_MODELS:
+    post_delete.connect(invalidate_cached_responses, sender=model, dispatch_uid=f'cache_delete_{model._meta.model_name}')
+
+
+# Dashboard rollups, see management.stats. The stored row is read before an
+# update so the counters it used to contribute to can be decremented.
+def snapshot_stats(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance._stats_old = stored_values(sender, instance.pk) if instance.pk else None
+
+
+def track_stats_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        track_change(sender, getattr(instance, '_stats_old', None), instance_values(instance))
+
+
+def track_creator_department(sender, instance, raw=False, **kwargs):
+    # Request counters are keyed by their creator's current department
+    old = getattr(instance, '_stats_old', None)
+    if not raw and old is not None:
+        move_creator_counts(instance.pk, old['department'], instance.department)
+
+
+def track_stats_delete(sender, instance, **kwargs):
+    track_change(sender, instance_values(instance), None)
+
+
+def track_stats_bulk_create(sender, instances, **kwargs):
+    track_bulk_create(sender, instances)
+
+
+for model in TRACKED_FIELDS:
+    pre_save.connect(snapshot_stats, sender=model, dispatch_uid=f'stats_snapshot_{model._meta.model_name}')
+    post_save.connect(track_stats_save, sender=model, dispatch_uid=f'stats_save_{model._meta.model_name}')
+    post_delete.connect(track_stats_delete, sender=model, dispatch_uid=f'stats_delete_{model._meta.model_name}')
+    post_bulk_create.connect(track_stats_bulk_create, sender=model, dispatch_uid=f'stats_bulk_{model._meta.model_name}')
+post_save.connect(track_creator_department, sender=Staff, dispatch_uid='stats_creator_department')
+
+
+# Normalized copy of ItemRequest.items, see management.item_lines
+@receiver(post_save, sender=ItemRequest, dispatch_uid='item_request_lines_save')
+def sync_item_request_lines(sender, instance, created, **kwargs):
+    if created:
+        create_lines([instance])
+    else:
+        sync_lines([instance])
+
+
+@receiver(post_bulk_create, sender=ItemRequest, dispatch_uid='item_request_lines_bulk')
+def create_item_request_lines(sender, instances, **kwargs):
+    create_lines(instances)
+
+
+# Full-text search documents, see management.search. Activity log documents
+# are removed by archival and the API delete instead of a post_delete
+# receiver, for the same reason as above.
+def index_search_document(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_objects(sender, [instance])
+
+
+def index_search_documents(sender, instances, **kwargs):
+    index_objects(sender, instances)
+
+
+def remove_search_document(sender, instance, **kwargs):
+    remove_objects(sender, [instance.pk])
+
+
+for model in (Staff, Facility, VehicleRequest, ActivityLog):
+    post_save.connect(index_search_document, sender=model, dispatch_uid=f'search_save_{model._meta.model_name}')
+    post_bulk_create.connect(index_search_documents, sender=model, dispatch_uid=f'search_bulk_{model._meta.model_name}')
+for model in (Staff, Facility, VehicleRequest):
+    post_delete.connect(remove_search_document, sender=model, dispatch_uid=f'search_delete_{model._meta.model_name}')
+
+
+# In-process typeahead index, see management.typeahead
+def update_typeahead(sender, instance, raw=False, **kwargs):
+    if not raw:
+        kind = TYPEAHEAD_KINDS[sender]
+        transaction.on_commit(lambda: get_typeahead().changed(kind, instance))
+
+
+def update_typeahead_bulk(sender, instances, **kwargs):
+    kind = TYPEAHEAD_KINDS[sender]
+    transaction.on_commit(lambda: [get_typeahead().changed(kind, instance) for instance in instances])
+
+
+def remove_from_typeahead(sender, instance, **kwargs):
+    kind, pk = TYPEAHEAD_KINDS[sender], instance.pk
+    transaction.on_commit(lambda: get_typeahead().deleted(kind, pk))
+
+
+TYPEAHEAD_KINDS = {model: kind for kind, (model, *_) in TYPEAHEAD_SOURCES.items()}
+for model in TYPEAHEAD_KINDS:
+    post_save.connect(update_typeahead, sender=model, dispatch_uid=f'typeahead_save_{model._meta.model_name}')
+    post_bulk_create.connect(update_typeahead_bulk, sender=model, dispatch_uid=f'typeahead_bulk_{model._meta.model_name}')
+    post_delete.connect(remove_from_typeahead, sender=model, dispatch_uid=f'typeahead_delete_{model._meta.model_name}')
+
+
+# Change feed, see management.feed. Activity logs are published by the
+# writer's flush, which bypasses these signals.
+def publish_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        publish_on_commit(events_for(sender, 'created' if created else 'updated', [instance]))
+
+
+def publish_delete(sender, instance, **kwargs):
+    publish_on_commit(events_for(sender, 'deleted', [instance]))
+
+
+def publish_bulk_create(sender, instances, **kwargs):
+    publish_on_commit(events_for(sender, 'created', instances))
+
+
+for model in FEED_KINDS:
+    if model is not ActivityLog:
+        post_save.connect(publish_save, sender=model, dispatch_uid=f'feed_save_{model._meta.model_name}')
+        post_delete.connect(publish_delete, sender=model, dispatch_uid=f'feed_delete_{model._meta.model_name}')
+        post_bulk_create.connect(publish_bulk_create, sender=model, dispatch_uid=f'feed_bulk_{model._meta.model_name}')
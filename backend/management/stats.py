@@ -0,0 +1,133 @@
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import *
+
+TOTAL = 'all'
+
+
+def contributions(model, values):
+    """
+    The (metric, key) counters one row adds 1 to. `values` maps field names
+    to the row's values, plus `department` for the creator's department on
+    request models.
+    """
+    if model is Staff:
+        return [
+            ('staff.total', TOTAL),
+            ('staff.department', values['department']),
+            ('staff.status', values['status']),
+        ]
+    counters = [('requests.department', values['department'])]
+    if model is VehicleRequest:
+        counters += [('vehicle_requests.total', TOTAL), ('vehicle_requests.stage', values['approval_stage'])]
+    elif model is ItemRequest:
+        counters += [('item_requests.total', TOTAL)]
+    elif model is InventoryChecklist:
+        counters += [('inventory_checklists.total', TOTAL), ('inventory_checklists.outlet', values['retail_outlet'])]
+    return counters
+
+
+TRACKED_FIELDS = {
+    Staff: ['department', 'status'],
+    VehicleRequest: ['approval_stage', 'created_by__department'],
+    ItemRequest: ['created_by__department'],
+    InventoryChecklist: ['retail_outlet', 'created_by__department'],
+}
+
+
+def instance_values(instance):
+    values = {field: getattr(instance, field) for field in TRACKED_FIELDS[type(instance)] if '__' not in field}
+    if hasattr(instance, 'created_by_id'):
+        values['department'] = instance.created_by.department
+    return values
+
+
+def stored_values(model, pk):
+    row = model.objects.filter(pk=pk).values(*TRACKED_FIELDS[model]).first()
+    if row is not None and 'created_by__department' in row:
+        row['department'] = row.pop('created_by__department')
+    return row
+
+
+def increment(metric, key, delta):
+    if not delta:
+        return
+    counters = StatCounter.objects.filter(metric=metric, key=key)
+    if counters.update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            StatCounter.objects.create(metric=metric, key=key, value=delta)
+    except IntegrityError:
+        # Another writer created the row first
+        counters.update(value=F('value') + delta)
+
+
+def apply(deltas):
+    for (metric, key), delta in deltas.items():
+        increment(metric, str(key), delta)
+
+
+def track_change(model, old_values, new_values):
+    deltas = Counter()
+    if old_values is not None:
+        deltas.subtract(contributions(model, old_values))
+    if new_values is not None:
+        deltas.update(contributions(model, new_values))
+    apply(deltas)
+
+
+def move_creator_counts(staff_id, old_department, new_department):
+    """
+    Move the `requests.department` counts of the requests created by
+    `staff_id` from its old department to its new one, with one grouped
+    query per request model.
+    """
+    if old_department == new_department:
+        return
+    with transaction.atomic():
+        rows = 0
+        for model, fields in TRACKED_FIELDS.items():
+            if 'created_by__department' in fields:
+                counts = model.objects.filter(created_by=staff_id).values('created_by').annotate(rows=Count('pk'))
+                rows += sum(row['rows'] for row in counts.order_by())
+        apply({('requests.department', old_department): -rows, ('requests.department', new_department): rows})
+
+
+def track_bulk_create(model, instances):
+    deltas = Counter()
+    for instance in instances:
+        deltas.update(contributions(model, instance_values(instance)))
+    apply(deltas)
+
+
+def get_stats():
+    stats = defaultdict(dict)
+    for metric, key, value in StatCounter.objects.values_list('metric', 'key', 'value'):
+        stats[metric][key] = value
+    return dict(stats)
+
+
+def rebuild_stats():
+    """
+    Recompute every counter from the source tables with GROUP BY queries and
+    replace the stored rollups in one transaction.
+    """
+    deltas = Counter()
+    for model, fields in TRACKED_FIELDS.items():
+        for row in model.objects.values(*fields).annotate(rows=Count('pk')).order_by():
+            rows = row.pop('rows')
+            if 'created_by__department' in row:
+                row['department'] = row.pop('created_by__department')
+            for counter in contributions(model, row):
+                deltas[counter] += rows
+
+    with transaction.atomic():
+        StatCounter.objects.all().delete()
+        StatCounter.objects.bulk_create(
+            [StatCounter(metric=metric, key=str(key), value=value) for (metric, key), value in deltas.items() if value]
+        )
+    return len(deltas)
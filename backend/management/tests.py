@@ -1,3 +1,1250 @@
-from django.test import TestCase
+import asyncio
+import decimal
+import gzip
+import importlib
+import io
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from appAuth.models import User
+from . import analytics
+from .activity import ActivityLogWriter
+from .cache import written_key
+from .fastpath import get_list_plan
+from .importers import hash_pool
+from .feed import FeedHub
+from .renderers import FastJSONParser, FastJSONRenderer, orjson
+from .typeahead import PrefixIndex, Typeahead, index_keys
+from .archive import archive_activity_logs
+from .models import *
+from .query_plans import hot_queries, uses_index
+from .routers import ReplicaRouter, replica_reads
+from .mixins import FastListMixin
+from .serializers import *
+from .stats import get_stats, rebuild_stats
+
+
+def migration_apps(name):
+    """
+    The historical models of the `management` app as of migration `name`.
+    """
+    return MigrationLoader(connection).project_state(('management', name)).apps
+
+
+def make_staff(n=1, **kwargs):
+    return Staff.objects.create(
+        staff_id=kwargs.pop('staff_id', f'NM{n:05d}'),
+        name=kwargs.pop('name', f'Staff {n}'),
+        department=kwargs.pop('department', 'ICT'),
+        role=kwargs.pop('role', 'staff'),
+        email=kwargs.pop('email', f'staff{n}@nmdpra.gov.ng'),
+        **kwargs
+    )
+
+
+class APITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='admin@nmdpra.gov.ng', password='secret123', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class CursorPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = make_staff()
+        ActivityLog.objects.bulk_create(
+            [ActivityLog(activity=f'activity {i}', created_by=self.staff) for i in range(7)]
+        )
+
+    def collect(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_pages_are_stable_and_complete(self):
+        ids = self.collect('/api/v1/activity-log/?page_size=3')
+        expected = list(ActivityLog.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    @override_settings(MAX_PAGE_SIZE=2)
+    def test_page_size_is_capped(self):
+        response = self.client.get('/api/v1/activity-log/?page_size=100')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_facility_pages_by_id(self):
+        Facility.objects.bulk_create(
+            [Facility(name=f'Depot {i}', address='Lagos', serial_no=str(i)) for i in range(3)]
+        )
+        ids = self.collect('/api/v1/facility/?page_size=2')
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(len(ids), 3)
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class ListQueryCountTests(APITestCase):
+    """
+    Every list endpoint must run the same number of queries whatever the
+    page size; a change here usually means an N+1 crept into a serializer.
+    """
+    endpoints = {
+        '/api/v1/staff/': 1,
+        '/api/v1/item-request/': 1,
+        '/api/v1/vehicle-request/': 1,
+        '/api/v1/inventory-checklist/': 1,
+        '/api/v1/activity-log/': 1,
+        '/api/v1/facility/': 1,
+        '/api/v1/item-request/?expand=created_by': 1,
+        '/api/v1/vehicle-request/?expand=created_by': 1,
+        '/api/v1/inventory-checklist/?expand=created_by': 1,
+        '/api/v1/activity-log/?expand=created_by': 1,
+    }
+
+    def setUp(self):
+        super().setUp()
+        staff = [make_staff(n) for n in range(20)]
+        ItemRequest.objects.bulk_create(
+            [ItemRequest(items=[{'description': 'Toner', 'unit': 'pcs', 'quantity': '2'}], created_by=s) for s in staff]
+        )
+        VehicleRequest.objects.bulk_create([
+            VehicleRequest(
+                name=s.name, divison='ICT', vehicle_type='Bus', purpose='Inspection', destination='Abuja',
+                departure_date='2025-01-01', return_date='2025-01-02', duration_of_trip=1, created_by=s
+            )
+            for s in staff
+        ])
+        InventoryChecklist.objects.bulk_create([
+            InventoryChecklist(
+                retail_outlet='Outlet', retail_outlet_address='Kano', pms_opening=100, product_recieved=50,
+                price_range=617.5, pump_dispensing_level=10, created_by=s
+            )
+            for s in staff
+        ])
+        ActivityLog.objects.bulk_create([ActivityLog(activity='Logged in', created_by=s) for s in staff])
+        Facility.objects.bulk_create(
+            [Facility(name=f'Depot {i}', address='Lagos', serial_no=str(i)) for i in range(20)]
+        )
+
+    def test_query_counts_do_not_depend_on_page_size(self):
+        for url, expected in self.endpoints.items():
+            separator = '&' if '?' in url else '?'
+            for page_size in (1, 5, 20):
+                with self.subTest(url=url, page_size=page_size):
+                    with self.assertNumQueries(expected):
+                        response = self.client.get(f'{url}{separator}page_size={page_size}')
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(len(response.data['results']), page_size)
+
+    def test_expanded_created_by(self):
+        response = self.client.get('/api/v1/activity-log/?expand=created_by')
+        row = response.data['results'][0]
+        self.assertEqual(set(row['created_by']), {'id', 'staff_id', 'name', 'department', 'role', 'email'})
+
+
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        staff = make_staff()
+        for label, queryset, index_names in hot_queries(staff):
+            with self.subTest(label):
+                self.assertTrue(uses_index(queryset, index_names), queryset.explain())
+
+
+class BulkCreateTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = [make_staff(n) for n in range(3)]
+
+    def checklist(self, staff_id, **kwargs):
+        return {
+            'retail_outlet': 'Outlet', 'retail_outlet_address': 'Kano', 'pms_opening': 100,
+            'product_recieved': 50, 'price_range': 617.5, 'pump_dispensing_level': 10,
+            'created_by': staff_id, **kwargs
+        }
+
+    def test_bulk_create_uses_constant_queries(self):
+        payload = [self.checklist(self.staff[i % 3].pk) for i in range(30)]
+        StatCounter.objects.bulk_create([
+            StatCounter(metric='requests.department', key='ICT'),
+            StatCounter(metric='inventory_checklists.total', key='all'),
+            StatCounter(metric='inventory_checklists.outlet', key='Outlet'),
+        ])
+        # staff lookup, savepoint, insert, one update per stat counter, release
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/v1/inventory-checklist/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(len(response.data), 30)
+        self.assertEqual(InventoryChecklist.objects.count(), 30)
+        self.assertEqual(get_stats()['inventory_checklists.outlet'], {'Outlet': 30})
+
+    def test_bulk_create_reports_errors_per_item(self):
+        payload = [self.checklist(self.staff[0].pk), self.checklist(999999), self.checklist(self.staff[1].pk, pms_opening='x')]
+        response = self.client.post('/api/v1/inventory-checklist/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.data['errors']
+        self.assertEqual(errors[0], {})
+        self.assertIn('created_by', errors[1])
+        self.assertIn('pms_opening', errors[2])
+        self.assertFalse(InventoryChecklist.objects.exists())
+
+    @override_settings(BULK_MAX_ITEMS=2)
+    def test_bulk_create_limits_batch_size(self):
+        payload = [{'items': [], 'created_by': self.staff[0].pk}] * 3
+        response = self.client.post('/api/v1/item-request/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ActivityLogWriterTests(TestCase):
+    def setUp(self):
+        self.writer = ActivityLogWriter(batch_size=3, background=False)
+        patcher = mock.patch('management.activity._writer', self.writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entries_are_written_in_batches(self):
+        staff = make_staff()
+        for i in range(2):
+            self.writer.log(staff.pk, f'activity {i}')
+        self.assertFalse(ActivityLog.objects.exists())
+        # staff check, then the log and search document inserts in a savepoint
+        with self.assertNumQueries(5):
+            self.writer.log(staff.pk, 'activity 2')
+        self.assertEqual(ActivityLog.objects.count(), 3)
+
+    def test_model_changes_are_audited_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            staff = make_staff()
+            request_id = ItemRequest.objects.create(items=[], created_by=staff).pk
+            ItemRequest.objects.filter(pk=request_id).delete()
+        self.writer.flush()
+        self.assertEqual(
+            list(ActivityLog.objects.order_by('id').values_list('activity', flat=True)),
+            [
+                f'Staff {staff.name} ({staff.staff_id}) created',
+                f'Item request #{request_id} created',
+                f'Item request #{request_id} deleted',
+            ],
+        )
+
+    def test_entries_for_deleted_staff_are_dropped(self):
+        staff = make_staff()
+        self.writer.log(staff.pk, 'activity')
+        self.writer.log(staff.pk + 1000, 'orphan')
+        self.writer.flush()
+        self.assertEqual(list(ActivityLog.objects.values_list('activity', flat=True)), ['activity'])
+
+    def test_deleting_staff_keeps_their_audit_rows(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            staff, other = make_staff(1), make_staff(2)
+        self.writer.flush()
+        log = ActivityLog.objects.get(created_by=staff)
+
+        staff_id = staff.pk
+        staff.delete()
+        connection.check_constraints()
+        self.assertEqual(
+            sorted(ActivityLog.objects.values_list('created_by', flat=True)), sorted([staff_id, other.pk])
+        )
+        self.assertTrue(SearchDocument.objects.filter(kind='activity-log', object_id=log.pk).exists())
+
+
+class ActivityLogArchiveTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = make_staff()
+        ActivityLog.objects.bulk_create([ActivityLog(activity=f'old {i}', created_by=self.staff) for i in range(5)])
+        ActivityLog.objects.update(created_at=timezone.now() - timedelta(days=200))
+        self.recent = ActivityLog.objects.create(activity='recent', created_by=self.staff)
+
+    def test_old_rows_move_to_archive_table_in_chunks(self):
+        self.assertEqual(archive_activity_logs(days=90, chunk_size=2), 5)
+        self.assertEqual(list(ActivityLog.objects.values_list('id', flat=True)), [self.recent.id])
+        self.assertEqual(ActivityLogArchive.objects.count(), 5)
+
+        response = self.client.get('/api/v1/activity-log/?archive=true&expand=created_by')
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(response.data['results'][0]['created_by']['id'], self.staff.id)
+
+    def test_old_rows_export_to_monthly_files(self):
+        with tempfile.TemporaryDirectory() as export_dir:
+            self.assertEqual(archive_activity_logs(days=90, chunk_size=2, export_dir=export_dir), 5)
+            files = list(Path(export_dir).glob('activity_logs_*.jsonl.gz'))
+            self.assertEqual(len(files), 1)
+            with gzip.open(files[0], 'rt') as archive:
+                rows = [json.loads(line) for line in archive]
+        self.assertEqual(sorted(row['activity'] for row in rows), [f'old {i}' for i in range(5)])
+        self.assertFalse(ActivityLogArchive.objects.exists())
+        self.assertEqual(ActivityLog.objects.count(), 1)
+
+
+class FilteringTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.ict = make_staff(1, name='Amina Bello', department='ICT')
+        self.finance = make_staff(2, name='Musa Ade', department='Finance', status='inactive')
+        for staff, departure, approved in [(self.ict, '2025-01-05', True), (self.finance, '2025-02-10', False)]:
+            VehicleRequest.objects.create(
+                name=staff.name, divison=staff.department, vehicle_type='Bus', purpose='Inspection',
+                destination='Abuja', departure_date=departure, return_date=departure, duration_of_trip=1,
+                division_head_approval=approved, created_by=staff
+            )
+
+    def ids(self, url, key='id'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [row[key] for row in response.data['results']]
+
+    def test_vehicle_request_filters(self):
+        first, second = VehicleRequest.objects.order_by('id')
+        self.assertEqual(self.ids('/api/v1/vehicle-request/?division_head_approval=true'), [first.id])
+        self.assertEqual(self.ids('/api/v1/vehicle-request/?departure_after=2025-02-01'), [second.id])
+        self.assertEqual(self.ids(f'/api/v1/vehicle-request/?created_by={self.ict.id}'), [first.id])
+        self.assertEqual(self.ids('/api/v1/vehicle-request/?department=Finance'), [second.id])
+        self.assertEqual(self.ids('/api/v1/vehicle-request/?created_after=2999-01-01'), [])
+
+    def test_invalid_filter_values_are_rejected(self):
+        response = self.client.get('/api/v1/vehicle-request/?departure_after=yesterday')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('departure_after', response.data)
+
+    def test_staff_search_status_and_ordering(self):
+        staff_ids = lambda url: self.ids(url, key='staff_id')
+        self.assertEqual(staff_ids('/api/v1/staff/?search=ami'), ['NM00001'])
+        self.assertEqual(staff_ids('/api/v1/staff/?search=NM00002'), ['NM00002'])
+        self.assertEqual(staff_ids('/api/v1/staff/?search=bello'), [])
+        self.assertEqual(staff_ids('/api/v1/staff/?status=inactive'), ['NM00002'])
+        self.assertEqual(staff_ids('/api/v1/staff/?ordering=name'), ['NM00001', 'NM00002'])
+        self.assertEqual(staff_ids('/api/v1/staff/?ordering=-name'), ['NM00002', 'NM00001'])
+
+    def test_client_ordering_pages_without_gaps(self):
+        Staff.objects.bulk_create([
+            Staff(staff_id=f'NM1{n:04d}', name='Same Name', department='ICT', role='staff', email=f'same{n}@nmdpra.gov.ng')
+            for n in range(7)
+        ])
+        for ordering in ('name', '-department'):
+            ids, url = [], f'/api/v1/staff/?ordering={ordering}&page_size=2'
+            while url:
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                # Rows sharing the ordered value are ordered by id
+                self.assertIn('"staff"."id" DESC LIMIT', queries[-1]['sql'])
+                ids += [row['staff_id'] for row in response.data['results']]
+                url = response.data['next']
+            self.assertEqual(sorted(ids), sorted(Staff.objects.values_list('staff_id', flat=True)), ordering)
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class ConditionalRequestTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = make_staff()
+        self.checklist = InventoryChecklist.objects.create(
+            retail_outlet='Outlet', retail_outlet_address='Kano', pms_opening=100, product_recieved=50,
+            price_range=617.5, pump_dispensing_level=10, created_by=self.staff
+        )
+        self.url = f'/api/v1/inventory-checklist/{self.checklist.id}/'
+
+    def test_retrieve_answers_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertIn('Last-Modified', response)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        InventoryChecklist.objects.filter(pk=self.checklist.pk).update(updated_at=timezone.now() + timedelta(seconds=5))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_answers_not_modified_until_the_page_changes(self):
+        etag = self.client.get('/api/v1/inventory-checklist/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/inventory-checklist/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.checklist.delete()
+        response = self.client.get('/api/v1/inventory-checklist/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_writes_honour_if_match(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.patch(self.url, {'pms_opening': 120}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.patch(self.url, {'pms_opening': 130}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.checklist.refresh_from_db()
+        self.assertEqual(self.checklist.pms_opening, 120)
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': True})
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.facility = Facility.objects.create(name='Depot', address='Lagos', serial_no='1')
+
+    def test_list_is_served_from_cache_until_a_write(self):
+        self.assertEqual(self.client.get('/api/v1/facility/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/facility/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        self.facility.name = 'Renamed depot'
+        self.facility.save()
+        response = self.client.get('/api/v1/facility/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['name'], 'Renamed depot')
+
+    def test_cached_list_keeps_conditional_semantics(self):
+        etag = self.client.get('/api/v1/facility/')['ETag']
+        response = self.client.get('/api/v1/facility/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['X-Cache']), (304, 'HIT'))
+
+    def test_staff_changes_invalidate_expanded_requests(self):
+        staff = make_staff()
+        ItemRequest.objects.create(items=[], created_by=staff)
+        self.client.get('/api/v1/item-request/?expand=created_by')
+        staff.name = 'New name'
+        staff.save()
+        response = self.client.get('/api/v1/item-request/?expand=created_by')
+        self.assertEqual(response.data['results'][0]['created_by']['name'], 'New name')
+
+    def test_profile_is_cached_per_user(self):
+        self.client.get('/api/auth/profile/')
+        self.assertEqual(self.client.get('/api/auth/profile/')['X-Cache'], 'HIT')
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email='other@nmdpra.gov.ng', password='secret123'))
+        response = other.get('/api/auth/profile/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['is_active'], True)
+
+    def test_stats_count_hits_and_misses(self):
+        self.client.get('/api/v1/facility/')
+        self.client.get('/api/v1/facility/')
+        stats = self.client.get('/api/v1/cache-stats/').data
+        self.assertGreaterEqual(stats['facility.list.hits'], 1)
+        self.assertGreaterEqual(stats['facility.list.misses'], 1)
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = make_staff()
+        ActivityLog.objects.bulk_create([ActivityLog(activity=f'activity, {i}', created_by=self.staff) for i in range(3)])
+
+    def test_csv_export_streams_filtered_rows(self):
+        response = self.client.get(f'/api/v1/activity-log/export/?created_by={self.staff.id}')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,activity,created_by,created_at,updated_at')
+        self.assertEqual(len(lines), 4)
+        self.assertIn('"activity, 0"', lines[1])
+
+    def test_gzipped_jsonl_export(self):
+        response = self.client.get('/api/v1/activity-log/export/?output=jsonl&gzip=1')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="activity-log.jsonl.gz"')
+        rows = [json.loads(line) for line in gzip.decompress(b''.join(response.streaming_content)).splitlines()]
+        self.assertEqual([row['activity'] for row in rows], [f'activity, {i}' for i in range(3)])
+        self.assertEqual(rows[0]['created_by'], self.staff.id)
+
+    def test_unknown_format_is_rejected(self):
+        self.assertEqual(self.client.get('/api/v1/activity-log/export/?output=xml').status_code, 400)
+
+
+@override_settings(PASSWORD_HASHER_ITERATIONS=1000)
+class ImportTests(APITestCase):
+    def upload(self, url, content, name='staff.csv'):
+        upload = SimpleUploadedFile(name, content.encode(), content_type='text/csv')
+        return self.client.post(url, {'file': upload}, format='multipart')
+
+    def test_staff_import_skips_invalid_and_duplicate_rows(self):
+        make_staff(1)
+        content = (
+            'staff_id,name,department,role,email,password\n'
+            'NM10001,Amina Bello,ICT,staff,amina@nmdpra.gov.ng,secret123\n'
+            'NM00001,Taken Id,ICT,staff,new@nmdpra.gov.ng,secret123\n'
+            'NM10002,Bad Email,ICT,staff,not-an-email,secret123\n'
+            'NM10001,Repeated,ICT,staff,other@nmdpra.gov.ng,secret123\n'
+            'NM10003,Musa Ade,Finance,supervisor,musa@nmdpra.gov.ng,\n'
+        )
+        with override_settings(BULK_IMPORT={'CHUNK_SIZE': 2, 'HASH_WORKERS': 2}), \
+                mock.patch('management.importers.ProcessPoolExecutor') as pool:
+            response = self.upload('/api/v1/staff/import/?create_users=true', content)
+        # Web workers never fork a hashing pool
+        pool.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 4, 5])
+
+        amina = User.objects.select_related('staff').get(email='amina@nmdpra.gov.ng')
+        self.assertTrue(amina.check_password('secret123'))
+        self.assertEqual(amina.staff.staff_id, 'NM10001')
+        self.assertFalse(User.objects.get(email='musa@nmdpra.gov.ng').has_usable_password())
+
+    @override_settings(BULK_IMPORT={'CHUNK_SIZE': 2, 'HASH_WORKERS': 2})
+    def test_command_hashes_in_a_process_pool(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'staff.csv'
+            path.write_text(
+                'staff_id,name,department,role,email,password\n'
+                'NM10001,Amina Bello,ICT,staff,amina@nmdpra.gov.ng,secret123\n'
+                'NM10002,Musa Ade,Finance,staff,musa@nmdpra.gov.ng,secret456\n'
+                'NM10003,Hauwa Sani,HR,staff,hauwa@nmdpra.gov.ng,secret789\n'
+            )
+            with mock.patch('management.importers.hash_pool', wraps=hash_pool) as pool:
+                call_command('import_records', 'staff', str(path), '--create-users', stdout=io.StringIO())
+        pool.assert_called_once_with(2)
+        self.assertTrue(User.objects.get(email='hauwa@nmdpra.gov.ng').check_password('secret789'))
+
+    @override_settings(BULK_IMPORT={'HTTP_USER_ROWS': 2})
+    def test_user_creating_imports_are_capped(self):
+        content = 'staff_id,name,department,role,email,password\n' + ''.join(
+            f'NM1000{n},Staff {n},ICT,staff,staff{n}@nmdpra.gov.ng,secret123\n' for n in range(3)
+        )
+        response = self.upload('/api/v1/staff/import/?create_users=true', content)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('import_records staff', response.data['file'])
+        self.assertFalse(Staff.objects.exists())
+        # Without user accounts there is nothing to hash, and no cap
+        self.assertEqual(self.upload('/api/v1/staff/import/', content).data['created'], 3)
+
+    def test_facility_import(self):
+        content = 'name,address,serial_no\nDepot A,Lagos,A1\n,Kano,B2\n'
+        response = self.upload('/api/v1/facility/import/', content, name='facilities.csv')
+        self.assertEqual(response.data['created'], 1)
+        self.assertIn('name', response.data['errors'][0]['errors'])
+
+    def test_import_requires_admin(self):
+        self.client.force_authenticate(User.objects.create_user(email='plain@nmdpra.gov.ng', password='secret123'))
+        self.assertEqual(self.upload('/api/v1/facility/import/', 'name\n').status_code, 403)
+
+    def test_unsupported_file_type(self):
+        self.assertEqual(self.upload('/api/v1/facility/import/', 'x', name='facilities.txt').status_code, 400)
+
+
+class StatsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.ict = make_staff(1)
+        self.hr = make_staff(2, department='HR')
+
+    def vehicle_request(self, staff, **kwargs):
+        return VehicleRequest.objects.create(
+            created_by=staff, name=staff.name, divison=staff.department, vehicle_type='Hilux', purpose='Meeting',
+            destination='Abuja', departure_date='2026-01-05', return_date='2026-01-06', duration_of_trip=1, **kwargs
+        )
+
+    def test_counters_follow_writes(self):
+        request = self.vehicle_request(self.ict)
+        self.vehicle_request(self.hr, division_head_approval=True)
+        ItemRequest.objects.create(created_by=self.hr, items=[])
+
+        request.division_head_approval = True
+        request.save()
+        self.ict.status = 'inactive'
+        self.ict.save()
+        request.delete()
+
+        stats = self.client.get('/api/v1/stats/').data
+        self.assertEqual(stats['vehicle_requests.total'], {'all': 1})
+        self.assertEqual(stats['vehicle_requests.stage'], {'pending_division_head': 0, 'pending_corporate_service': 1})
+        self.assertEqual(stats['requests.department'], {'ICT': 0, 'HR': 2})
+        self.assertEqual(stats['staff.status'], {'active': 1, 'inactive': 1})
+
+    def test_rebuild_matches_incremental_counters(self):
+        self.vehicle_request(self.ict)
+        self.vehicle_request(self.hr, division_head_approval=True, corporate_service_approval=True, logistics_officer_approval=True)
+        InventoryChecklist.objects.create(
+            created_by=self.ict, retail_outlet='Outlet', retail_outlet_address='Kano', pms_opening=1,
+            product_recieved=1, price_range=1, pump_dispensing_level=1
+        )
+        incremental = {metric: {key: value for key, value in counts.items() if value} for metric, counts in get_stats().items()}
+        rebuild_stats()
+        self.assertEqual(get_stats(), incremental)
+
+    def test_department_changes_move_request_counters(self):
+        self.vehicle_request(self.ict)
+        ItemRequest.objects.create(created_by=self.ict, items=[])
+        self.ict.department = 'Finance'
+        self.ict.save()
+        incremental = {metric: {key: value for key, value in counts.items() if value} for metric, counts in get_stats().items()}
+        self.assertEqual(incremental['requests.department'], {'Finance': 2})
+        rebuild_stats()
+        self.assertEqual(get_stats(), incremental)
+
+    def test_stats_view_uses_one_query(self):
+        self.vehicle_request(self.ict)
+        with self.assertNumQueries(1):
+            get_stats()
+
+
+class InventoryAnalyticsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = make_staff(1)
+
+    def checklist(self, outlet, pms_opening, created_at):
+        checklist = InventoryChecklist.objects.create(
+            created_by=self.staff, retail_outlet=outlet, retail_outlet_address='Kano', pms_opening=pms_opening,
+            product_recieved=50, price_range=617.5, pump_dispensing_level=10
+        )
+        InventoryChecklist.objects.filter(pk=checklist.pk).update(created_at=created_at)
+        return checklist
+
+    def create_series(self):
+        september = timezone.make_aware(timezone.datetime(2026, 9, 1, 8))
+        october = timezone.make_aware(timezone.datetime(2026, 10, 1, 8))
+        for day, opening in enumerate([100, 110, 130]):
+            self.checklist('Kano 1', opening, september + timedelta(days=day))
+        self.checklist('Kano 1', 120, october)
+        for day in range(11):
+            self.checklist('Kano 2', 100, october + timedelta(days=day))
+        return self.checklist('Kano 2', 1000, october + timedelta(days=11))
+
+    def check_analytics(self):
+        outlier = self.create_series()
+        data = self.client.get('/api/v1/inventory-checklist/analytics/').data
+
+        kano1, kano2 = data['outlets']
+        self.assertEqual((kano1['retail_outlet'], kano1['count']), ('Kano 1', 4))
+        pms = kano1['metrics']['pms_opening']
+        self.assertEqual((pms['sum'], pms['mean'], pms['min'], pms['max']), (460, 115, 100, 130))
+        self.assertEqual(pms['delta_mean'], round(20 / 3, 4))
+        september, october = kano1['periods']
+        self.assertEqual(str(september['period']), '2026-09-01')
+        self.assertEqual(september['metrics']['pms_opening']['delta_mean'], 15)
+        self.assertEqual(october['metrics']['pms_opening']['delta_mean'], -10)
+
+        self.assertEqual(len(data['anomalies']), 1)
+        anomaly = data['anomalies'][0]
+        self.assertEqual((anomaly['id'], anomaly['metric'], anomaly['value']), (outlier.pk, 'pms_opening', 1000))
+        self.assertGreater(anomaly['z_score'], 3)
+        return data
+
+    def test_numpy_path(self):
+        # numpy is a requirement; the pure Python path is only a fallback
+        self.assertIsNotNone(analytics.np)
+        with mock.patch.object(analytics, '_python_analysis') as python_analysis:
+            self.check_analytics()
+        python_analysis.assert_not_called()
+
+    def test_python_fallback_matches(self):
+        with mock.patch.object(analytics, 'np', None):
+            self.check_analytics()
+
+    def test_filters_and_validation(self):
+        self.create_series()
+        data = self.client.get('/api/v1/inventory-checklist/analytics/?retail_outlet=Kano 1&period=day').data
+        self.assertEqual([outlet['retail_outlet'] for outlet in data['outlets']], ['Kano 1'])
+        self.assertEqual(len(data['outlets'][0]['periods']), 4)
+        self.assertIsNone(data['outlets'][0]['periods'][0]['metrics']['pms_opening']['delta_mean'])
+        response = self.client.get('/api/v1/inventory-checklist/analytics/?period=year&threshold=-1')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {'period', 'threshold'})
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': True})
+    def test_cached_until_checklist_written(self):
+        self.create_series()
+        url = '/api/v1/inventory-checklist/analytics/'
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+        self.checklist('Kano 3', 100, timezone.now())
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['outlets']), 3)
+
+
+class ItemRequestLineTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.ict = make_staff(1)
+        self.hr = make_staff(2, department='HR')
+
+    def items(self, *entries):
+        return [{'description': description, 'unit': unit, 'quantity': quantity, 'allocation': 'Store'} for description, unit, quantity in entries]
+
+    def test_lines_follow_items(self):
+        request = ItemRequest.objects.create(created_by=self.ict, items=self.items(('A4 paper', 'ream', '5'), ('Toner', 'pcs', 'two')))
+        self.assertEqual(
+            list(request.lines.order_by('position').values_list('description', 'unit', 'quantity')),
+            [('A4 paper', 'ream', 5.0), ('Toner', 'pcs', None)]
+        )
+        request.items = self.items(('Stapler', 'pcs', '1'))
+        request.save()
+        self.assertEqual(list(request.lines.values_list('description', flat=True)), ['Stapler'])
+        request.delete()
+        self.assertFalse(ItemRequestLine.objects.exists())
+
+    def test_migration_backfills_with_historical_models(self):
+        request = ItemRequest.objects.create(created_by=self.ict, items=self.items(('A4 paper', 'ream', '1,200')))
+        ItemRequestLine.objects.all().delete()
+        migration = importlib.import_module('management.migrations.0007_item_request_lines')
+        migration.backfill_lines(migration_apps('0007_item_request_lines'), None)
+        self.assertEqual(list(request.lines.values_list('description', 'quantity')), [('A4 paper', 1200.0)])
+
+    def test_bulk_created_requests_get_lines(self):
+        payload = [{'created_by': self.ict.pk, 'items': self.items(('A4 paper', 'ream', '2'))} for _ in range(3)]
+        response = self.client.post('/api/v1/item-request/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(ItemRequestLine.objects.filter(description='A4 paper').count(), 3)
+
+    def test_totals(self):
+        ItemRequest.objects.create(created_by=self.ict, items=self.items(('A4 paper', 'ream', '5'), ('Toner', 'pcs', '1')))
+        ItemRequest.objects.create(created_by=self.hr, items=self.items(('A4 paper', 'ream', '3')))
+        url = '/api/v1/item-request-lines/totals/'
+
+        response = self.client.get(url)
+        self.assertEqual(response.data, [
+            {'description': 'A4 paper', 'unit': 'ream', 'requests': 2, 'quantity': 8.0},
+            {'description': 'Toner', 'unit': 'pcs', 'requests': 1, 'quantity': 1.0},
+        ])
+        self.assertEqual(self.client.get(url + '?department=HR').data, [
+            {'description': 'A4 paper', 'unit': 'ream', 'requests': 1, 'quantity': 3.0},
+        ])
+        monthly = self.client.get(url + '?item=Toner&period=month').data
+        self.assertEqual(len(monthly), 1)
+        self.assertEqual(monthly[0]['period'], timezone.now().date().replace(day=1))
+        self.assertEqual(self.client.get(url + '?period=year').status_code, 400)
+
+
+class ApprovalWorkflowTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.requester = make_staff(1)
+        self.other_department = make_staff(2, department='HR')
+        self.head = make_staff(3, role='supervisor')
+        self.corporate = make_staff(4, role='corporate', department='Corporate Services')
+
+    def vehicle_request(self, staff, **kwargs):
+        return VehicleRequest.objects.create(
+            created_by=staff, name=staff.name, divison=staff.department, vehicle_type='Hilux', purpose='Meeting',
+            destination='Abuja', departure_date='2026-01-05', return_date='2026-01-06', duration_of_trip=1, **kwargs
+        )
+
+    def login(self, staff):
+        self.client.force_authenticate(User.objects.create_user(email=f'user.{staff.email}', password=None, staff=staff))
+
+    def pending_ids(self, query=''):
+        return [item['id'] for item in self.client.get(f'/api/v1/vehicle-request/pending/{query}').data['results']]
+
+    def test_stage_follows_approval_flags(self):
+        request = self.vehicle_request(self.requester, division_head_approval=True)
+        self.assertEqual(request.approval_stage, 'pending_corporate_service')
+        request.corporate_service_approval = True
+        request.save(update_fields=['corporate_service_approval'])
+        request.refresh_from_db()
+        self.assertEqual(request.approval_stage, 'pending_logistics_officer')
+
+    def test_queue_is_scoped_by_role_and_department(self):
+        own = self.vehicle_request(self.requester)
+        self.vehicle_request(self.other_department)
+        waiting_on_corporate = self.vehicle_request(self.requester, division_head_approval=True)
+
+        self.login(self.head)
+        self.assertEqual(self.pending_ids(), [own.id])
+        self.login(self.corporate)
+        self.assertEqual(self.pending_ids(), [waiting_on_corporate.id])
+        self.login(self.requester)
+        self.assertEqual(self.pending_ids(), [])
+
+    def test_approve_moves_request_through_queues(self):
+        request = self.vehicle_request(self.requester)
+        self.login(self.head)
+        response = self.client.post(f'/api/v1/vehicle-request/{request.id}/approve/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['approval_stage'], 'pending_corporate_service')
+        self.assertTrue(response.data['division_head_approval'])
+        self.assertEqual(self.pending_ids(), [])
+        self.assertEqual(self.client.post(f'/api/v1/vehicle-request/{request.id}/approve/').status_code, 403)
+
+        self.login(self.corporate)
+        self.assertEqual(self.pending_ids('?stage=pending_corporate_service'), [request.id])
+        self.assertEqual(self.client.post(f'/api/v1/vehicle-request/{request.id}/reject/').status_code, 200)
+        self.assertEqual(self.client.post(f'/api/v1/vehicle-request/{request.id}/approve/').status_code, 409)
+        request.refresh_from_db()
+        self.assertEqual(request.approval_stage, 'rejected')
+
+    def test_other_department_head_cannot_approve(self):
+        request = self.vehicle_request(self.other_department)
+        self.login(self.head)
+        self.assertEqual(self.client.post(f'/api/v1/vehicle-request/{request.id}/approve/').status_code, 403)
+        self.assertEqual(self.client.post('/api/v1/vehicle-request/999999/approve/').status_code, 404)
+
+    def test_bulk_created_requests_get_their_stage(self):
+        payload = [{
+            'created_by': self.requester.pk, 'name': 'Trip', 'divison': 'ICT', 'vehicle_type': 'Bus', 'purpose': 'Audit',
+            'destination': 'Kano', 'departure_date': '2026-02-01', 'return_date': '2026-02-02', 'duration_of_trip': 1,
+            'division_head_approval': False,
+        }]
+        response = self.client.post('/api/v1/vehicle-request/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data[0]['approval_stage'], 'pending_division_head')
+
+        payload[0]['division_head_approval'] = True
+        response = self.client.post('/api/v1/vehicle-request/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('division_head_approval', response.data['errors'][0])
+
+    def test_update_cannot_approve(self):
+        request = self.vehicle_request(self.requester)
+        self.login(self.requester)
+        url = f'/api/v1/vehicle-request/{request.id}/'
+        response = self.client.patch(url, {
+            'division_head_approval': True, 'corporate_service_approval': False, 'approval_stage': 'approved',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        # Unchanged values pass, so forms that send the whole object keep working
+        self.assertEqual(set(response.data), {'division_head_approval', 'approval_stage'})
+        self.assertIn('/approve/', response.data['division_head_approval'][0])
+        request.refresh_from_db()
+        self.assertEqual(request.approval_stage, 'pending_division_head')
+        self.assertFalse(request.division_head_approval)
+        response = self.client.patch(url, {'purpose': 'Audit', 'division_head_approval': False}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.amina = make_staff(1, name='Amina Bello', department='Downstream')
+        self.musa = make_staff(2, name='Musa Aminu')
+        self.depot = Facility.objects.create(name='Kano Depot', address='Amina Street', serial_no='FAC-001')
+
+    def search(self, query):
+        response = self.client.get(f'/api/v1/search/{query}')
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(result['type'], result['id']) for result in response.data['results']]
+
+    def test_ranked_prefix_search(self):
+        # Title matches (names) outrank body matches (the facility address)
+        self.assertEqual(self.search('?q=amin')[-1], ('facility', self.depot.pk))
+        self.assertEqual(set(self.search('?q=amin')[:2]), {('staff', self.amina.pk), ('staff', self.musa.pk)})
+        self.assertEqual(self.search('?q=amina bel'), [('staff', self.amina.pk)])
+        self.assertEqual(set(self.search('?q=NM0000')), {('staff', self.amina.pk), ('staff', self.musa.pk)})
+        self.assertEqual(self.search('?q=fac-001'), [('facility', self.depot.pk)])
+        self.assertEqual(self.search('?q=amin&type=facility'), [('facility', self.depot.pk)])
+
+    def test_index_follows_writes(self):
+        self.amina.name = 'Hauwa Bello'
+        self.amina.save()
+        self.assertEqual(self.search('?q=hauwa'), [('staff', self.amina.pk)])
+        self.depot.delete()
+        self.assertEqual(self.search('?q=kano'), [])
+        log = ActivityLog.objects.create(created_by=self.musa, activity='Approved fuel delivery')
+        self.assertEqual(self.search('?q=fuel'), [('activity-log', log.pk)])
+        self.client.delete(f'/api/v1/activity-log/{log.pk}/')
+        self.assertEqual(self.search('?q=fuel'), [])
+
+    def test_migration_backfills_with_historical_models(self):
+        SearchDocument.objects.all().delete()
+        migration = importlib.import_module('management.migrations.0009_search_documents')
+        migration.backfill_index(migration_apps('0009_search_documents'), None)
+        self.assertEqual(self.search('?q=amina bel'), [('staff', self.amina.pk)])
+        self.assertEqual(self.search('?q=fac-001'), [('facility', self.depot.pk)])
+
+    def test_pagination_and_validation(self):
+        Facility.objects.bulk_create([Facility(name=f'Depot {n}', address='Lagos', serial_no=f'D{n}') for n in range(5)])
+        # bulk_create without the post_bulk_create signal is not indexed
+        self.assertEqual(self.search('?q=depot'), [('facility', self.depot.pk)])
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        response = self.client.get('/api/v1/search/?q=depot&page_size=4')
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(len(self.client.get(response.data['next']).data['results']), 2)
+        self.assertEqual(self.client.get('/api/v1/search/').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/search/?q=x&type=vehicles').status_code, 400)
+
+
+class TypeaheadTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.amina = make_staff(1, name='Amina Bello')
+        self.musa = make_staff(2, name='Musa Aminu')
+        self.depot = Facility.objects.create(name='Kano Depot', address='Kano', serial_no='AM-001')
+        for target, value in [
+            ('management.typeahead._typeahead', Typeahead(refresh_interval=0)),
+            # on_commit callbacks also queue audit entries; keep them off the background thread
+            ('management.activity._writer', ActivityLogWriter(background=False)),
+        ]:
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def suggest(self, query):
+        response = self.client.get(f'/api/v1/typeahead/{query}')
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(result['type'], result['id']) for result in response.data]
+
+    def test_prefix_index(self):
+        index = PrefixIndex()
+        index.load([('staff', 1, 'amina', index_keys(['Amina Bello'])), ('staff', 2, 'bola', index_keys(['Bola']))])
+        index.add('staff', 3, 'bella', index_keys(['Bella']))
+        self.assertEqual(index.search('B', limit=10), ['bella', 'amina', 'bola'])
+        self.assertEqual(index.search('bel', limit=1), ['bella'])
+        index.remove('staff', 3)
+        self.assertEqual(index.search('bel'), ['amina'])
+        self.assertEqual(index.search('  '), [])
+
+    def test_suggestions(self):
+        self.assertEqual(self.suggest('?q=am'), [('facility', self.depot.pk), ('staff', self.amina.pk), ('staff', self.musa.pk)])
+        self.assertEqual(self.suggest('?q=bel'), [('staff', self.amina.pk)])
+        self.assertEqual(self.suggest('?q=nm00002'), [('staff', self.musa.pk)])
+        self.assertEqual(self.suggest('?q=am&type=staff&limit=1'), [('staff', self.amina.pk)])
+        self.assertEqual(self.client.get('/api/v1/typeahead/?q=am&limit=500').status_code, 400)
+        result = self.client.get('/api/v1/typeahead/?q=kano').data[0]
+        self.assertEqual(result, {'type': 'facility', 'id': self.depot.pk, 'label': 'Kano Depot', 'detail': 'AM-001'})
+
+    def test_index_follows_committed_writes(self):
+        self.suggest('?q=a')  # build the index
+        with self.captureOnCommitCallbacks(execute=True):
+            self.amina.name = 'Hauwa Bello'
+            self.amina.save()
+            self.depot.delete()
+        self.assertEqual(self.suggest('?q=amina'), [])
+        self.assertEqual(self.suggest('?q=hau'), [('staff', self.amina.pk)])
+        self.assertEqual(self.suggest('?q=kano'), [])
+
+        with self.captureOnCommitCallbacks(execute=False):
+            make_staff(3, name='Zainab Rolled-back')
+        self.assertEqual(self.suggest('?q=zai'), [])
+
+
+class DatabaseRoutingTests(APITestCase):
+    def test_replica_reads_only_inside_context(self):
+        router = ReplicaRouter()
+        router.replicas = ['replica_0']
+        self.assertIsNone(router.db_for_read(Staff))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Staff), 'replica_0')
+            self.assertIsNone(router.db_for_read(User))
+            self.assertEqual(router.db_for_write(Staff), 'default')
+        self.assertIsNone(router.db_for_read(Staff))
+        self.assertFalse(router.allow_migrate('replica_0', 'management'))
+
+    def test_only_list_and_retrieve_read_from_replicas(self):
+        staff = make_staff()
+        with mock.patch('management.mixins.replica_reads', wraps=replica_reads) as reads:
+            self.client.get('/api/v1/staff/')
+            self.client.get(f'/api/v1/activity-log/?created_by={staff.pk}')
+            self.assertEqual(reads.call_count, 2)
+            self.client.patch(f'/api/v1/staff/{staff.pk}/', {'name': 'Renamed'}, format='json')
+            self.assertEqual(reads.call_count, 2)
+
+    @mock.patch('management.cache.has_replicas', return_value=True)
+    @mock.patch('management.mixins.has_replicas', return_value=True)
+    def test_recent_writes_are_read_from_the_primary(self, *mocks):
+        with mock.patch('management.mixins.replica_reads', wraps=replica_reads) as reads:
+            response = self.client.post('/api/v1/facility/', {'name': 'Depot', 'address': 'Kano', 'serial_no': 'D1'})
+            self.client.get(f"/api/v1/facility/{response.data['id']}/")
+            # Requests refer to the staff table, which was not written
+            self.client.get('/api/v1/vehicle-request/')
+            self.assertEqual([call.args for call in reads.call_args_list], [(False,), (True,)])
+
+            # Past the lag the replicas are used again
+            cache.delete(written_key(Facility))
+            self.assertEqual(self.client.get('/api/v1/facility/').status_code, 200)
+            self.assertEqual(reads.call_args.args, (True,))
+
+    def test_sqlite_connections_use_wal(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        self.assertEqual(settings.DATABASES['default']['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': str(Path(directory) / 'wal.sqlite3')}, alias='wal_check')
+            try:
+                with wrapper.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.assertEqual(cursor.fetchone()[0], 'wal')
+            finally:
+                wrapper.close()
+
+
+class AsyncReadViewTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = make_staff()
+        created = timezone.now()
+        logs = ActivityLog.objects.bulk_create(
+            ActivityLog(activity=f'Log {i}', created_by=self.staff) for i in range(5)
+        )
+        # Two rows share a timestamp so the id tie-breaker is exercised
+        for i, log in enumerate(logs):
+            ActivityLog.objects.filter(pk=log.pk).update(created_at=created - timedelta(minutes=i // 2))
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    async def test_list_pages_match_the_sync_endpoint(self):
+        seen, url = [], '/api/v1/async/activity-log/?page_size=2'
+        while url:
+            response = await self.async_client.get(url, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            seen += [row['id'] for row in data['results']]
+            url = data['next']
+        expected = [pk async for pk in ActivityLog.objects.order_by('-created_at', '-id').values_list('pk', flat=True)]
+        self.assertEqual(seen, expected)
+
+    async def test_filters_expand_and_retrieve(self):
+        response = await self.async_client.get(
+            f'/api/v1/async/activity-log/?created_by={self.staff.pk}&expand=created_by', headers=self.headers
+        )
+        self.assertEqual(response.json()['results'][0]['created_by']['staff_id'], 'NM00001')
+        response = await self.async_client.get('/api/v1/async/activity-log/?created_by=abc', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.async_client.get(f'/api/v1/async/staff/{self.staff.pk}/', headers=self.headers)
+        self.assertEqual(response.json()['staff_id'], 'NM00001')
+        response = await self.async_client.get('/api/v1/async/staff/999999/', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    async def test_requires_a_token(self):
+        response = await self.async_client.get('/api/v1/async/staff/')
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/api/v1/async/staff/', headers={'Authorization': 'Bearer nonsense'})
+        self.assertEqual(response.status_code, 401)
+
+
+class ChangeFeedTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = make_staff(department='ICT')
+        self.hub = FeedHub(buffer_size=3, client_queue_size=2)
+        for target, value in [
+            ('management.feed._hub', self.hub),
+            ('management.activity._writer', ActivityLogWriter(background=False)),
+        ]:
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.reader = User.objects.create_user(email='reader@nmdpra.gov.ng', password=None, staff=self.staff)
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.reader).access_token}'}
+
+    async def test_resume_and_backpressure(self):
+        self.hub.publish('staff', 'created', 1, 'ICT')
+        subscriber, replay = self.hub.subscribe(lambda event: event['department'] == 'ICT')
+        self.assertEqual(replay, [])
+        last_id = self.hub._buffer[-1]['id']
+        for pk in (2, 3, 4):
+            self.hub.publish('staff', 'updated', pk, 'ICT')
+        await asyncio.sleep(0)
+        # The client queue holds 2 events: the third cuts the client off
+        self.assertIsNone(await subscriber.queue.get())
+        self.hub.unsubscribe(subscriber)
+
+        _, replay = self.hub.subscribe(lambda event: True, last_id)
+        self.assertEqual([event['object_id'] for event in replay], [2, 3, 4])
+        self.hub.publish('staff', 'updated', 5, 'ICT')
+        # Event 2 has left the 3 event buffer
+        self.assertIsNone(self.hub.subscribe(lambda event: True, last_id)[1])
+        self.assertIsNone(self.hub.subscribe(lambda event: True, 'otherprocess-9')[1])
+
+    def test_wsgi_requests_are_refused(self):
+        # A WSGI server would buffer the endless stream and never answer
+        response = self.client.get('/api/v1/feed/', HTTP_AUTHORIZATION=self.headers['Authorization'])
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('ASGI', response.json()['detail'])
+        self.assertFalse(self.hub._subscribers)
+
+    def test_writes_are_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            facility = Facility.objects.create(name='Depot', address='Kano', serial_no='F-1')
+            other = make_staff(2, department='Finance')
+            other.delete()
+        events = [(e['type'], e['action'], e['department']) for e in self.hub._buffer]
+        self.assertEqual(events, [
+            ('facility', 'created', None), ('staff', 'created', 'Finance'), ('staff', 'deleted', 'Finance'),
+        ])
+        self.assertEqual(self.hub._buffer[0]['object_id'], facility.pk)
+
+    def test_request_writes_do_not_look_up_the_creator(self):
+        vehicle_request = VehicleRequest.objects.create(
+            created_by=self.staff, name=self.staff.name, divison='ICT', vehicle_type='Bus', purpose='Inspection',
+            destination='Abuja', departure_date='2026-01-05', return_date='2026-01-06', duration_of_trip=1
+        )
+        url = f'/api/v1/vehicle-request/{vehicle_request.pk}/'
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.patch(url, {'purpose': 'Audit'}, format='json').status_code, 200)
+            self.assertEqual(self.client.delete(url).status_code, 204)
+        # The creator's department comes from the join in the lookup query
+        self.assertFalse([query for query in queries if query['sql'].startswith('SELECT "staff"')])
+        events = [(e['action'], e['department']) for e in self.hub._buffer]
+        self.assertEqual(events[-2:], [('updated', 'ICT'), ('deleted', 'ICT')])
+
+    async def test_stream_is_filtered_by_department(self):
+        self.hub.publish('staff', 'created', 1, 'ICT')
+        first = self.hub._buffer[-1]['id']
+        self.hub.publish('staff', 'created', 2, 'Finance')
+        self.hub.publish('facility', 'created', 3, None)
+
+        response = await self.async_client.get('/api/v1/feed/', headers={**self.headers, 'Last-Event-ID': first})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        chunk = await anext(chunks)
+        self.assertIn(b'event: change', chunk)
+        self.assertEqual(json.loads(chunk.split(b'data: ')[1])['object_id'], 3)
+        self.hub.publish('vehicle-request', 'updated', 4, 'ICT')
+        self.assertEqual(json.loads((await anext(chunks)).split(b'data: ')[1])['object_id'], 4)
+        await chunks.aclose()
+
+        response = await self.async_client.get('/api/v1/feed/?type=bogus', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.get('/api/v1/feed/')
+        self.assertEqual(response.status_code, 401)
+
+
+class SparseFieldsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = make_staff()
+        for i in range(3):
+            ActivityLog.objects.create(activity=f'Activity {i}', created_by=self.staff)
+
+    def test_fields_and_exclude(self):
+        response = self.client.get('/api/v1/activity-log/?fields=id,activity&page_size=2')
+        self.assertEqual([set(row) for row in response.data['results']], [{'id', 'activity'}] * 2)
+        # Paging still works off the columns that were not rendered
+        self.assertEqual(len(self.client.get(response.data['next']).data['results']), 1)
+
+        row = self.client.get(f'/api/v1/staff/{self.staff.pk}/?exclude=url,created_at,updated_at').data
+        self.assertEqual(set(row), {'staff_id', 'name', 'department', 'role', 'email', 'status'})
+        response = self.client.get('/api/v1/staff/?fields=name,salary')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('salary', response.data['fields'])
+
+    def test_unused_columns_are_not_fetched(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/v1/activity-log/?fields=id')
+        sql = [q['sql'] for q in queries.captured_queries if 'FROM "activity_logs"' in q['sql']][-1]
+        self.assertNotIn('"activity"', sql)
+        self.assertNotIn('"created_by_id"', sql)
+
+    def test_compact_rows(self):
+        response = self.client.get('/api/v1/activity-log/?fields=id,activity,created_by&expand=created_by&compact=true')
+        self.assertEqual(response.data['fields'], ['id', 'activity', 'created_by'])
+        first = response.data['results'][0]
+        self.assertEqual(first[1], 'Activity 2')
+        self.assertEqual(first[2]['staff_id'], 'NM00001')
+        full = self.client.get('/api/v1/activity-log/').data['results']
+        self.assertEqual(len(response.data['results']), len(full))
+
+
+class FastJSONTests(TestCase):
+    def setUp(self):
+        staff = make_staff(name='Zoë Adé\u2028Musa')
+        VehicleRequest.objects.create(
+            created_by=staff, name=staff.name, divison='ICT', vehicle_type='Hilux', purpose='Meeting',
+            destination='Abuja', departure_date='2026-01-05', return_date='2026-01-06', duration_of_trip=1
+        )
+        InventoryChecklist.objects.create(
+            created_by=staff, retail_outlet='Outlet', retail_outlet_address='Kano', pms_opening=1,
+            product_recieved=1, price_range=617.25, pump_dispensing_level=1
+        )
+
+    def assertRendersLikeDRF(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_matches_the_stdlib_renderer(self):
+        # orjson is a requirement; without it the renderer would be compared with itself
+        self.assertIsNotNone(orjson)
+        self.assertRendersLikeDRF(VehicleRequestSerializer(VehicleRequest.objects.all(), many=True).data)
+        self.assertRendersLikeDRF(InventoryChecklistSerializer(InventoryChecklist.objects.all(), many=True).data)
+        self.assertRendersLikeDRF(StaffSummarySerializer(Staff.objects.all(), many=True).data)
+        self.assertRendersLikeDRF({
+            'when': timezone.now(), 'day': timezone.now().date(), 'amount': decimal.Decimal('1.50'),
+            'big': 2 ** 70, 1: {'nested': [None, True, 'Abuja']},
+        })
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch('management.renderers.orjson', None):
+            self.assertRendersLikeDRF({'when': timezone.now()})
+
+    def test_non_finite_floats_are_rejected(self):
+        for value in (float('nan'), float('inf'), decimal.Decimal('-Infinity')):
+            with self.assertRaises(ValueError):
+                JSONRenderer().render({'value': [None, {'x': value}]})
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({'value': [None, {'x': value}]})
+        self.assertRendersLikeDRF({'value': [None, 1.5, decimal.Decimal('2.5')]})
+
+    def test_parser(self):
+        parse = lambda body: FastJSONParser().parse(io.BytesIO(body))
+        self.assertEqual(parse('{"name": "Zoë", "ids": [1, 2]}'.encode()), {'name': 'Zoë', 'ids': [1, 2]})
+        for body in (b'{"name": ', b'{"value": NaN}'):
+            with self.assertRaises(ParseError):
+                parse(body)
+        with mock.patch('management.renderers.orjson', None):
+            self.assertEqual(parse(b'[1]'), [1])
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class FastListTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        staff = make_staff()
+        Facility.objects.create(name='Kano Depot', address='Kano', serial_no='F-1', take_over=None)
+        ItemRequest.objects.create(created_by=staff, items=[{'description': 'Toner', 'quantity': '2 boxes'}])
+        VehicleRequest.objects.create(
+            created_by=staff, name=staff.name, divison='ICT', vehicle_type='Hilux', purpose='Meeting',
+            destination='Abuja', departure_date='2026-01-05', return_date='2026-01-06', duration_of_trip=1
+        )
+        InventoryChecklist.objects.create(
+            created_by=staff, retail_outlet='Outlet', retail_outlet_address='Kano', pms_opening=1,
+            product_recieved=1, price_range=617.25, pump_dispensing_level=1
+        )
+        for i in range(3):
+            ActivityLog.objects.create(created_by=staff, activity=f'Activity {i}')
+        ActivityLog.objects.filter(activity='Activity 0').update(created_at=timezone.now() - timedelta(days=200))
+        archive_activity_logs(days=90)
+
+    def test_plans_cover_the_list_serializers(self):
+        for serializer_class in (
+            ItemRequestSerializer, VehicleRequestSerializer, InventoryChecklistSerializer,
+            ActivityLogSerializer, ActivityLogArchiveSerializer, FacilitySerializer,
+        ):
+            self.assertIsNotNone(get_list_plan(serializer_class).renderer(serializer_class().fields), serializer_class)
+        # Hyperlinks are left to the serializer
+        self.assertIsNone(get_list_plan(StaffSerializer).renderer(StaffSerializer().fields))
+
+    def test_output_matches_the_serializers(self):
+        serializer_list = lambda view, request, *args, **kwargs: super(FastListMixin, view).list(request, *args, **kwargs)
+        for url in [
+            '/api/v1/item-request/', '/api/v1/vehicle-request/', '/api/v1/inventory-checklist/',
+            '/api/v1/activity-log/', '/api/v1/activity-log/?archive=true', '/api/v1/facility/',
+            '/api/v1/activity-log/?page_size=2&ordering=created_at', '/api/v1/activity-log/?expand=created_by',
+            '/api/v1/vehicle-request/?fields=id,approval_stage,departure_date&compact=true',
+            '/api/v1/staff/', '/api/v1/staff/?exclude=url',
+        ]:
+            fast = self.client.get(url)
+            with mock.patch.object(FastListMixin, 'list', serializer_list):
+                slow = self.client.get(url)
+            self.assertEqual(fast.status_code, 200, url)
+            self.assertEqual(fast.content, slow.content, url)
+            self.assertEqual(fast['ETag'], slow['ETag'], url)
+
+    def test_datetimes_follow_the_active_timezone(self):
+        serializer_list = lambda view, request, *args, **kwargs: super(FastListMixin, view).list(request, *args, **kwargs)
+        with timezone.override('Africa/Lagos'):
+            fast = self.client.get('/api/v1/activity-log/')
+            with mock.patch.object(FastListMixin, 'list', serializer_list):
+                slow = self.client.get('/api/v1/activity-log/')
+        self.assertIn('+01:00', fast.json()['results'][0]['created_at'])
+        self.assertEqual(fast.content, slow.content)
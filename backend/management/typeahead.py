@@ -0,0 +1,221 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connections
+
+from .models import Facility, Staff
+
+logger = logging.getLogger(__name__)
+
+# kind: (model, indexed fields, label field, detail field)
+TYPEAHEAD_SOURCES = {
+    'staff': (Staff, ('name', 'staff_id'), 'name', 'staff_id'),
+    'facility': (Facility, ('name', 'serial_no'), 'name', 'serial_no'),
+}
+
+
+def normalize(text):
+    return ' '.join(str(text).lower().split())
+
+
+def index_keys(values):
+    """
+    Every string a prefix search should match an object by: each value
+    whole, plus the tail starting at each later word, so "bel" finds
+    "Amina Bello".
+    """
+    keys = set()
+    for value in values:
+        words = normalize(value or '').split(' ')
+        keys.update(' '.join(words[i:]) for i in range(len(words)) if words[i])
+    return keys
+
+
+class PrefixIndex:
+    """
+    Sorted list of (key, kind, pk) tuples searched with `bisect`: a lookup
+    costs O(log n) plus the matches returned, whatever the table sizes.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, kind, pk, result, keys):
+        with self._lock:
+            self._remove((kind, pk))
+            self._entries[kind, pk] = (result, tuple(keys))
+            for key in keys:
+                insort(self._keys, (key, kind, pk))
+
+    def remove(self, kind, pk):
+        with self._lock:
+            self._remove((kind, pk))
+
+    def _remove(self, entry_key):
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            i = bisect_left(self._keys, (key, *entry_key))
+            if i < len(self._keys) and self._keys[i] == (key, *entry_key):
+                del self._keys[i]
+
+    def load(self, entries):
+        """
+        Bulk load `(kind, pk, result, keys)` entries with a single sort.
+        """
+        with self._lock:
+            for kind, pk, result, keys in entries:
+                self._entries[kind, pk] = (result, tuple(keys))
+                self._keys.extend((key, kind, pk) for key in keys)
+            self._keys.sort()
+
+    def search(self, prefix, limit=10, kinds=None):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        results, seen = [], set()
+        with self._lock:
+            i = bisect_left(self._keys, (prefix,))
+            while i < len(self._keys) and len(results) < limit:
+                key, kind, pk = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                if (kind, pk) not in seen and (kinds is None or kind in kinds):
+                    seen.add((kind, pk))
+                    results.append(self._entries[kind, pk][0])
+                i += 1
+        return results
+
+
+def entry_for(kind, obj):
+    _, fields, label, detail = TYPEAHEAD_SOURCES[kind]
+    result = {'type': kind, 'id': obj.pk, 'label': getattr(obj, label), 'detail': getattr(obj, detail)}
+    return kind, obj.pk, result, index_keys(getattr(obj, field) for field in fields)
+
+
+def load_entries():
+    for kind, (model, fields, _, _) in TYPEAHEAD_SOURCES.items():
+        for obj in model.objects.only('pk', *fields).iterator(chunk_size=5000):
+            yield entry_for(kind, obj)
+
+
+def get_typeahead_settings():
+    config = getattr(settings, 'TYPEAHEAD', {})
+    return {
+        'limit': config.get('LIMIT', 10),
+        'max_limit': config.get('MAX_LIMIT', 50),
+        'refresh_interval': config.get('REFRESH_INTERVAL', 300),
+    }
+
+
+class Typeahead:
+    """
+    Owns this process's PrefixIndex. It is built on first use and kept
+    current by model signals. Other processes' writes only reach it through
+    a full rebuild every `refresh_interval` seconds. That rebuild runs on a
+    background thread while the old index keeps serving; changes made
+    meanwhile are replayed onto the new index before it is swapped in.
+    """
+
+    def __init__(self, refresh_interval=300):
+        self.refresh_interval = refresh_interval
+        self._index = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._pending = None
+
+    def get_index(self):
+        if self._index is None:
+            self.rebuild()
+            # Another thread may be running the first build
+            self._ready.wait()
+            if self._index is None:
+                raise RuntimeError('The typeahead index could not be built.')
+        elif self.refresh_interval and time.monotonic() - self._built_at > self.refresh_interval:
+            self.refresh_in_background()
+        return self._index
+
+    def search(self, prefix, limit=10, kinds=None):
+        return self.get_index().search(prefix, limit, kinds)
+
+    def rebuild(self):
+        with self._lock:
+            if self._pending is not None:
+                return
+            self._pending = []
+            if self._index is None:
+                self._ready.clear()
+        index = PrefixIndex()
+        try:
+            index.load(load_entries())
+        except Exception:
+            with self._lock:
+                self._pending = None
+            self._ready.set()
+            raise
+        with self._lock:
+            pending, self._pending = self._pending, None
+            for change in pending:
+                self._apply(index, *change)
+            self._index = index
+            self._built_at = time.monotonic()
+        self._ready.set()
+
+    def refresh_in_background(self):
+        with self._lock:
+            if self._pending is not None:
+                return
+            self._built_at = time.monotonic()
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception('Failed to rebuild the typeahead index')
+            finally:
+                connections.close_all()
+
+        threading.Thread(target=run, name='typeahead-rebuild', daemon=True).start()
+
+    def changed(self, kind, obj):
+        self._record(kind, obj.pk, entry_for(kind, obj))
+
+    def deleted(self, kind, pk):
+        self._record(kind, pk, None)
+
+    def _record(self, kind, pk, entry):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((kind, pk, entry))
+            if self._index is not None:
+                self._apply(self._index, kind, pk, entry)
+
+    @staticmethod
+    def _apply(index, kind, pk, entry):
+        if entry is None:
+            index.remove(kind, pk)
+        else:
+            index.add(*entry)
+
+
+_typeahead = None
+_typeahead_lock = threading.Lock()
+
+
+def get_typeahead():
+    global _typeahead
+    if _typeahead is None:
+        with _typeahead_lock:
+            if _typeahead is None:
+                _typeahead = Typeahead(refresh_interval=get_typeahead_settings()['refresh_interval'])
+    return _typeahead
@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 
+from .async_views import AsyncReadView, change_feed_view
 from .views import *
 
 router = routers.DefaultRouter()
@@ -12,5 +13,18 @@ router.register(r"activity-log", ActivityLogViewSet, basename='activity-log')
 router.register(r"facility", FacilityViewSet, basename='facility')
 
 urlpatterns = [
+    path('cache-stats/', cache_stats_view, name='cache-stats'),
+    path('stats/', stats_view, name='stats'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('typeahead/', typeahead_view, name='typeahead'),
+    path('feed/', change_feed_view, name='change-feed'),
+    path('item-request-lines/totals/', ItemRequestLineTotalsView.as_view(), name='item-request-line-totals'),
     path('', include(router.urls))
-]
\ No newline at end of file
+]
+
+# Async read-only mirrors of the router's resources, for ASGI deployments
+for prefix, viewset, basename in router.registry:
+    urlpatterns += [
+        path(f'async/{prefix}/', AsyncReadView.as_view(viewset=viewset), name=f'{basename}-async-list'),
+        path(f'async/{prefix}/<int:pk>/', AsyncReadView.as_view(viewset=viewset), name=f'{basename}-async-detail'),
+    ]
\ No newline at end of file
@@ -1,28 +1,236 @@
 from django.shortcuts import render
 from .models import *
 from .serializers import *
-from rest_framework import viewsets
+from django.db.models import Count, Sum
+from rest_framework import generics, serializers, status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser
+from rest_framework.response import Response
+from .analytics import PERIODS, inventory_analytics
+from .cache import CachedResponseMixin, cache_stats, cached_get, invalidate
+from .feed import events_for, publish_on_commit
+from .filters import CommaSeparatedChoiceField, QueryParamFilterBackend, created_filters, datetime_param, parse_query_params
+from .mixins import (
+    BulkCreateMixin, ConditionalRequestMixin, ExportMixin, FastListMixin, ImportMixin, ReplicaReadMixin, SparseFieldsMixin
+)
+from .pagination import IdCursorPagination, SearchPagination
+from .search import SEARCH_SOURCES, SearchResults, remove_objects
+from .stats import get_stats
+from .typeahead import TYPEAHEAD_SOURCES, get_typeahead, get_typeahead_settings
+from .workflow import PENDING_STAGES, approve_request, pending_queue, reject_request
 
-class StaffViewSet(viewsets.ModelViewSet):
+
+class CreatedByQuerysetMixin:
+    """
+    Join `created_by` when the serializer is going to expand it, so list
+    endpoints run a fixed number of queries whatever the page size, and on
+    writes, where the change feed needs the creator's department.
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in SAFE_METHODS or 'created_by' in get_expand_fields(self.request):
+            queryset = queryset.select_related('created_by')
+        return queryset
+
+
+class ManagementViewSet(
+    ExportMixin, ReplicaReadMixin, CachedResponseMixin, FastListMixin, ConditionalRequestMixin, SparseFieldsMixin,
+    viewsets.ModelViewSet
+):
+    """
+    Base for the management resources: export, replica reads, response
+    caching, fast list serialization, conditional requests and sparse
+    fieldsets on top of the standard model actions.
+    """
+
+
+class StaffViewSet(ImportMixin, ManagementViewSet):
     queryset = Staff.objects.all()
     serializer_class = StaffSerializer
+    filter_params = {
+        'created_after': ('created_at__gte', datetime_param()),
+        'created_before': ('created_at__lt', datetime_param()),
+        'department': ('department', serializers.CharField()),
+        'status': ('status', serializers.ChoiceField(choices=Staff.STATUS_CHOICES)),
+    }
+    search_fields = ['^name', '^staff_id']
+    ordering_fields = ['created_at', 'name', 'staff_id', 'department']
+    ordering = ('-created_at', '-id')
 
-class ItemRequestViewSet(viewsets.ModelViewSet):
+class ItemRequestViewSet(BulkCreateMixin, CreatedByQuerysetMixin, ManagementViewSet):
     queryset = ItemRequest.objects.all()
     serializer_class = ItemRequestSerializer
+    filter_params = created_filters()
+    ordering_fields = ['created_at']
+    ordering = ('-created_at', '-id')
 
-class VehicleRequestViewSet(viewsets.ModelViewSet):
+class VehicleRequestViewSet(BulkCreateMixin, CreatedByQuerysetMixin, ManagementViewSet):
     queryset = VehicleRequest.objects.all()
     serializer_class = VehicleRequestSerializer
+    filter_params = {
+        **created_filters(),
+        'departure_after': ('departure_date__gte', serializers.DateField()),
+        'departure_before': ('departure_date__lte', serializers.DateField()),
+        'division_head_approval': ('division_head_approval', serializers.BooleanField()),
+        'corporate_service_approval': ('corporate_service_approval', serializers.BooleanField()),
+        'logistics_officer_approval': ('logistics_officer_approval', serializers.BooleanField()),
+        'approval_stage': ('approval_stage', serializers.ChoiceField(choices=VehicleRequest.STAGE_CHOICES)),
+    }
+    ordering_fields = ['created_at', 'departure_date', 'return_date']
+    ordering = ('-created_at', '-id')
+
+    @action(detail=False, methods=['get'], url_path='pending')
+    def pending(self, request):
+        """
+        The requesting user's approval inbox, optionally limited to one `?stage=`.
+        """
+        options = parse_query_params(request, {'stage': serializers.ChoiceField(choices=PENDING_STAGES, required=False)})
+        queryset = self.filter_queryset(pending_queue(request.user, options.get('stage')))
+        if 'created_by' in get_expand_fields(request):
+            queryset = queryset.select_related('created_by')
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=True, methods=['post'])
+    def approve(self, request, pk=None):
+        return Response(self.get_serializer(approve_request(pk, request.user)).data, status=status.HTTP_200_OK)
 
-class InventoryChecklistViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['post'])
+    def reject(self, request, pk=None):
+        return Response(self.get_serializer(reject_request(pk, request.user)).data, status=status.HTTP_200_OK)
+
+class InventoryChecklistViewSet(BulkCreateMixin, CreatedByQuerysetMixin, ManagementViewSet):
     queryset = InventoryChecklist.objects.all()
     serializer_class = InventoryChecklistSerializer
+    filter_params = {
+        **created_filters(),
+        'retail_outlet': ('retail_outlet', serializers.CharField()),
+    }
+    ordering_fields = ['created_at', 'retail_outlet']
+    ordering = ('-created_at', '-id')
+
+    @action(detail=False, methods=['get'], url_path='analytics')
+    def analytics(self, request):
+        options = parse_query_params(request, {
+            'period': serializers.ChoiceField(choices=list(PERIODS), default='month'),
+            'threshold': serializers.FloatField(min_value=0, required=False),
+        })
+        queryset = self.filter_queryset(self.get_queryset())
+        compute = lambda: Response(inventory_analytics(queryset, **options), status=status.HTTP_200_OK)
+        return cached_get('inventory-checklist.analytics', [InventoryChecklist], request, compute)
 
-class ActivityLogViewSet(viewsets.ModelViewSet):
+class ActivityLogViewSet(CreatedByQuerysetMixin, ManagementViewSet):
+    """
+    Reads go to the archive table instead of `activity_logs` when the client
+    passes `?archive=true`.
+    """
     queryset = ActivityLog.objects.all()
     serializer_class = ActivityLogSerializer
+    filter_params = created_filters()
+    ordering_fields = ['created_at']
+    ordering = ('-created_at', '-id')
+
+    def reads_archive(self):
+        return self.request.method == 'GET' and self.request.query_params.get('archive') in ('true', '1')
+
+    def get_queryset(self):
+        if self.reads_archive():
+            self.queryset = ActivityLogArchive.objects.all()
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.reads_archive():
+            return ActivityLogArchiveSerializer
+        return super().get_serializer_class()
+
+    def perform_destroy(self, instance):
+        pk = instance.pk
+        events = events_for(ActivityLog, 'deleted', [instance])
+        super().perform_destroy(instance)
+        remove_objects(ActivityLog, [pk])
+        publish_on_commit(events)
+        invalidate(ActivityLog)
 
-class FacilityViewSet(viewsets.ModelViewSet):
+class FacilityViewSet(ImportMixin, ManagementViewSet):
     queryset = Facility.objects.all()
     serializer_class = FacilitySerializer
+    pagination_class = IdCursorPagination
+    search_fields = ['^name', '^serial_no']
+    ordering_fields = ['id', 'name']
+    ordering = ('-id',)
+
+
+class ItemRequestLineTotalsView(generics.GenericAPIView):
+    """
+    Total requested quantity of each item and unit, summed in SQL over
+    `item_request_lines`; `?period=day|week|month` splits the totals by
+    period.
+    """
+    queryset = ItemRequestLine.objects.all()
+    filter_backends = [QueryParamFilterBackend]
+    filter_params = {
+        'created_after': ('created_at__gte', datetime_param()),
+        'created_before': ('created_at__lt', datetime_param()),
+        'item': ('description', serializers.CharField()),
+        'created_by': ('item_request__created_by_id', serializers.IntegerField()),
+        'department': ('item_request__created_by__department', serializers.CharField()),
+    }
+
+    def get(self, request):
+        options = parse_query_params(request, {'period': serializers.ChoiceField(choices=list(PERIODS), required=False)})
+        return cached_get('item-request-lines.totals', [ItemRequest, Staff], request, lambda: self.totals(options.get('period')))
+
+    def totals(self, period):
+        queryset = self.filter_queryset(self.get_queryset())
+        fields = ['description', 'unit']
+        if period:
+            queryset = queryset.annotate(period=PERIODS[period]('created_at'))
+            fields.append('period')
+        totals = queryset.values(*fields).annotate(
+            requests=Count('item_request', distinct=True), quantity=Sum('quantity')
+        ).order_by(*fields)
+        return Response(list(totals), status=status.HTTP_200_OK)
+
+
+class SearchView(generics.GenericAPIView):
+    """
+    Ranked full-text search over staff, facilities, vehicle requests and
+    activity logs. `?q=` terms match as prefixes; `?type=staff,facility`
+    narrows the kinds searched.
+    """
+    pagination_class = SearchPagination
+
+    def get(self, request):
+        options = parse_query_params(request, {
+            'q': serializers.CharField(),
+            'type': CommaSeparatedChoiceField(SEARCH_SOURCES, required=False),
+        })
+        page = self.paginate_queryset(SearchResults(options['q'], options.get('type')))
+        return self.get_paginated_response(page)
+
+
+@api_view(['GET'])
+def typeahead_view(request):
+    """
+    Top matches for the `?q=` prefix among staff names and ids and facility
+    names and serial numbers, served from the in-process prefix index.
+    """
+    config = get_typeahead_settings()
+    options = parse_query_params(request, {
+        'q': serializers.CharField(),
+        'type': CommaSeparatedChoiceField(TYPEAHEAD_SOURCES, required=False),
+        'limit': serializers.IntegerField(min_value=1, max_value=config['max_limit'], default=config['limit']),
+    })
+    results = get_typeahead().search(options['q'], options['limit'], options.get('type'))
+    return Response(results, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats_view(request):
+    return Response(cache_stats(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def stats_view(request):
+    return Response(get_stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.exceptions import APIException, PermissionDenied
+
+from .models import VehicleRequest
+
+PENDING_STAGES = [stage for stage, _ in VehicleRequest.APPROVAL_FLAGS]
+
+
+class StageConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'This request is no longer pending approval.'
+    default_code = 'stage_conflict'
+
+
+def get_approval_settings():
+    config = getattr(settings, 'VEHICLE_APPROVAL', {})
+    return {
+        'roles': config.get('ROLES', {}),
+        'department_scoped': set(config.get('DEPARTMENT_SCOPED', ())),
+    }
+
+
+def is_workflow_admin(user):
+    return user.is_superuser or getattr(user, 'is_admin', False)
+
+
+def approver_stages(user):
+    """
+    The pending stages `user` may act on: every stage for admins, otherwise
+    the stages the VEHICLE_APPROVAL setting grants their staff role.
+    """
+    if is_workflow_admin(user):
+        return list(PENDING_STAGES)
+    staff = getattr(user, 'staff', None)
+    if staff is None:
+        return []
+    roles = get_approval_settings()['roles']
+    return [stage for stage in PENDING_STAGES if staff.role in roles.get(stage, ())]
+
+
+def pending_queue(user, stage=None):
+    """
+    Vehicle requests waiting on `user`, newest first. Department scoped
+    stages only include requests raised in the approver's own department.
+    Each stage is a range of the (approval_stage, created_at) index.
+    """
+    stages = approver_stages(user)
+    if stage is not None:
+        stages = [s for s in stages if s == stage]
+    if not stages:
+        return VehicleRequest.objects.none()
+
+    if is_workflow_admin(user):
+        condition = Q(approval_stage__in=stages)
+    else:
+        scoped = get_approval_settings()['department_scoped']
+        condition = Q()
+        for s in stages:
+            if s in scoped:
+                condition |= Q(approval_stage=s, created_by__department=user.staff.department)
+            else:
+                condition |= Q(approval_stage=s)
+    return VehicleRequest.objects.filter(condition).order_by('-created_at', '-id')
+
+
+def check_can_act(vehicle_request, user):
+    stage = vehicle_request.approval_stage
+    if stage not in PENDING_STAGES:
+        raise StageConflict(f'This request is already {stage}.')
+    if stage not in approver_stages(user):
+        raise PermissionDenied('You cannot act on requests at this stage.')
+    if (not is_workflow_admin(user) and stage in get_approval_settings()['department_scoped']
+            and vehicle_request.created_by.department != user.staff.department):
+        raise PermissionDenied('This request belongs to another department.')
+
+
+def locked_request(pk):
+    return get_object_or_404(VehicleRequest.objects.select_for_update().select_related('created_by'), pk=pk)
+
+
+def approve_request(pk, user):
+    """
+    Record `user`'s approval of the stage the request is at. The row is
+    locked for the duration, so two approvers cannot act on the same stage.
+    """
+    with transaction.atomic():
+        vehicle_request = locked_request(pk)
+        check_can_act(vehicle_request, user)
+        setattr(vehicle_request, dict(VehicleRequest.APPROVAL_FLAGS)[vehicle_request.approval_stage], True)
+        vehicle_request.save()
+    return vehicle_request
+
+
+def reject_request(pk, user):
+    with transaction.atomic():
+        vehicle_request = locked_request(pk)
+        check_can_act(vehicle_request, user)
+        vehicle_request.approval_stage = 'rejected'
+        vehicle_request.save()
+    return vehicle_request
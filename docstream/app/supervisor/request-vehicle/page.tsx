@@ -1,6 +1,7 @@
 'use client';
 
 import { useRouter } from "next/navigation";
+import { useAuth } from "@/context/AuthContext";
 import { useState, useEffect } from "react";
 
 interface VehicleRequest {
@@ -16,6 +17,7 @@ interface VehicleRequest {
   division_head_approval: boolean;
   corporate_service_approval: boolean;
   logistics_officer_approval: boolean;
+  approval_stage: string;
   created_at: string;
   updated_at: string;
   created_by: number;
@@ -23,6 +25,7 @@ interface VehicleRequest {
 
 export default function SupervisorVehicleRequests() {
   const router = useRouter();
+  const { accessToken } = useAuth();
   const [requests, setRequests] = useState<VehicleRequest[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
@@ -52,24 +55,23 @@ export default function SupervisorVehicleRequests() {
   const approveRequest = async (requestId: number) => {
     try {
       setApprovingId(requestId);
-      const response = await fetch(`http://127.0.0.1:8000/api/v1/vehicle-request/${requestId}/`, {
-        method: "PATCH",
+      const response = await fetch(`http://127.0.0.1:8000/api/v1/vehicle-request/${requestId}/approve/`, {
+        method: "POST",
         headers: {
-          "Content-Type": "application/json",
+          "Authorization": `Bearer ${accessToken}`,
         },
-        body: JSON.stringify({
-          division_head_approval: true
-        }),
       });
 
       if (!response.ok) {
         throw new Error("Failed to approve request");
       }
 
+      const updated: VehicleRequest = await response.json();
+
       // Update local state
       setRequests(prev => prev.map(req => 
         req.id === requestId 
-          ? { ...req, division_head_approval: true }
+          ? updated
           : req
       ));
       